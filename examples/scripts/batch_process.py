@@ -7,16 +7,98 @@ useful for large-scale document analysis projects.
 
 Usage:
     python batch_process.py --input-dirs dir1 dir2 dir3 --config my_config.yaml
-    python batch_process.py --input-file folder_list.txt
+    python batch_process.py --input-file folder_list.txt --workers 4
+    python batch_process.py --input-dirs dir1 dir2 --subprocess
 """
 
 import argparse
+import logging
+import multiprocessing.util
 import os
 import sys
 import subprocess
 import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import List
+from typing import Dict, Any
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+# Make the project root importable so extract.py can be loaded in-process
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from extract import DocumentRAGExtractor
+
+# Per-process extractor, created once by _init_worker and reused for every directory
+_EXTRACTOR = None
+
+def _init_worker(config_path: str, model_type: str, verbose: bool = False, workers: int = 1):
+    """Load the extractor (LLM client, processors) once per worker process"""
+    global _EXTRACTOR
+    
+    if verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+    
+    _EXTRACTOR = DocumentRAGExtractor(config_path=config_path, model_type=model_type)
+    
+    # Share the CPUs between directory workers instead of each extractor
+    # starting a full-size extraction (and CPU OCR) pool of its own
+    _EXTRACTOR.processing_config.setdefault('extraction_workers', max(1, (os.cpu_count() or 1) // workers))
+    
+    # Close the extractor when the worker exits: shuts down its extraction and OCR
+    # pools and saves the LLM cache. Finalize also runs in forked workers, which
+    # skip atexit handlers.
+    multiprocessing.util.Finalize(None, _EXTRACTOR.close, exitpriority=10)
+
+def _run_one(directory: str, output_file: str) -> Dict[str, Any]:
+    """Process a single directory with the worker's extractor"""
+    start_time = time.time()
+    results = _EXTRACTOR.process_documents(directory)
+    _EXTRACTOR.save_results(results, output_file)
+    
+    return {
+        'directory': directory,
+        'output_file': output_file,
+        'duration': time.time() - start_time,
+        'status': 'success',
+        'total_documents': results['extraction_metadata']['total_documents']
+    }
+
+def _run_subprocess(directory: str, output_file: str, config_path: str, model_type: str,
+                    verbose: bool = False) -> Dict[str, Any]:
+    """Process a single directory in its own extract.py process, streaming its output"""
+    cmd = [
+        sys.executable, str(PROJECT_ROOT / "extract.py"),
+        "--docs-dir", directory,
+        "--config", config_path,
+        "--model", model_type,
+        "--output", output_file
+    ]
+    
+    if verbose:
+        cmd.append("--verbose")
+    
+    start_time = time.time()
+    
+    # Read output line by line instead of buffering it all; keep only the tail for errors
+    tail = deque(maxlen=20)
+    with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1) as proc:
+        for line in proc.stdout:
+            line = line.rstrip()
+            tail.append(line)
+            if verbose:
+                print(f"  [{Path(directory).name}] {line}")
+    
+    if proc.returncode != 0:
+        raise RuntimeError("\n".join(tail) or f"extract.py exited with code {proc.returncode}")
+    
+    return {
+        'directory': directory,
+        'output_file': output_file,
+        'duration': time.time() - start_time,
+        'status': 'success'
+    }
 
 def main():
     parser = argparse.ArgumentParser(
@@ -47,6 +129,17 @@ def main():
         default="ollama",
         help="Model to use for extraction"
     )
+    parser.add_argument(
+        "--workers", 
+        type=int,
+        default=min(4, os.cpu_count() or 1),
+        help="Number of directories to process concurrently"
+    )
+    parser.add_argument(
+        "--subprocess", 
+        action="store_true",
+        help="Run each directory in a separate extract.py process (isolated, slower startup)"
+    )
     parser.add_argument(
         "--verbose", 
         "-v", 
@@ -63,7 +156,7 @@ def main():
         directories.extend(args.input_dirs)
     
     if args.input_file:
-        if os.path.exists(args.input_file):
+        if Path(args.input_file).exists():
             with open(args.input_file, 'r') as f:
                 directories.extend([line.strip() for line in f if line.strip()])
         else:
@@ -74,10 +167,10 @@ def main():
         print("❌ No directories specified. Use --input-dirs or --input-file")
         sys.exit(1)
     
-    # Validate directories
+    # Validate directories (one stat per path)
     valid_dirs = []
-    for dir_path in directories:
-        if os.path.isdir(dir_path):
+    for dir_path in map(Path, directories):
+        if dir_path.is_dir():
             valid_dirs.append(dir_path)
             print(f"✅ Found directory: {dir_path}")
         else:
@@ -88,69 +181,63 @@ def main():
         sys.exit(1)
     
     # Create output directory
-    os.makedirs(args.output_dir, exist_ok=True)
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
     print(f"📁 Output directory: {args.output_dir}")
     
-    # Process each directory
-    print(f"\n🚀 Processing {len(valid_dirs)} directories...")
+    # Process directories concurrently
+    print(f"\n🚀 Processing {len(valid_dirs)} directories with {args.workers} workers...")
     
     results = []
     total_start = time.time()
     
-    for i, directory in enumerate(valid_dirs, 1):
-        print(f"\n[{i}/{len(valid_dirs)}] Processing: {directory}")
-        
-        # Generate output filename
-        dir_name = os.path.basename(directory.rstrip('/'))
-        output_file = os.path.join(args.output_dir, f"{dir_name}_extraction.yaml")
-        
-        # Build command
-        cmd = [
-            "python", "extract.py",
-            "--docs-dir", directory,
-            "--config", args.config,
-            "--model", args.model,
-            "--output", output_file
-        ]
-        
-        if args.verbose:
-            cmd.append("--verbose")
-        
-        # Execute command
-        start_time = time.time()
-        try:
-            result = subprocess.run(
-                cmd, 
-                capture_output=True, 
-                text=True, 
-                check=True
-            )
-            end_time = time.time()
-            duration = end_time - start_time
+    max_workers = max(1, min(args.workers, len(valid_dirs)))
+    
+    if args.subprocess:
+        # Child processes do the work, so threads are enough to drive them
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+    else:
+        executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_worker,
+            initargs=(args.config, args.model, args.verbose, max_workers)
+        )
+    
+    with executor:
+        futures = {}
+        for directory in valid_dirs:
+            # Generate output filename ("." and similar have no name of their own)
+            dir_name = directory.name or directory.resolve().name
+            output_file = str(output_dir / f"{dir_name}_extraction.yaml")
             
-            print(f"✅ Completed in {duration:.1f}s: {output_file}")
-            results.append({
-                'directory': directory,
-                'output_file': output_file,
-                'duration': duration,
-                'status': 'success'
-            })
+            if args.subprocess:
+                future = executor.submit(_run_subprocess, str(directory), output_file, args.config, args.model, args.verbose)
+            else:
+                future = executor.submit(_run_one, str(directory), output_file)
+            futures[future] = (str(directory), time.time())
+        
+        for i, future in enumerate(as_completed(futures), 1):
+            directory, submitted_at = futures[future]
             
-            if args.verbose:
-                print(f"📊 Output: {result.stdout.strip()}")
+            try:
+                result = future.result()
+                print(f"[{i}/{len(valid_dirs)}] ✅ Completed in {result['duration']:.1f}s: {result['output_file']}")
+                results.append(result)
                 
-        except subprocess.CalledProcessError as e:
-            end_time = time.time()
-            duration = end_time - start_time
-            
-            print(f"❌ Failed after {duration:.1f}s: {directory}")
-            print(f"Error: {e.stderr.strip()}")
-            results.append({
-                'directory': directory,
-                'duration': duration,
-                'status': 'failed',
-                'error': e.stderr.strip()
-            })
+                if args.verbose and 'total_documents' in result:
+                    print(f"📊 Documents processed: {result['total_documents']}")
+                    
+            except Exception as e:
+                duration = time.time() - submitted_at
+                
+                print(f"[{i}/{len(valid_dirs)}] ❌ Failed after {duration:.1f}s: {directory}")
+                print(f"Error: {e}")
+                results.append({
+                    'directory': directory,
+                    'duration': duration,
+                    'status': 'failed',
+                    'error': str(e)
+                })
     
     # Summary
     total_end = time.time()
@@ -9,9 +9,25 @@ and all dependencies are properly installed.
 import sys
 import os
 import subprocess
+import functools
 import importlib.util
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+# Core and optional dependencies: (module, description)
+DEPENDENCIES = [
+    ("pdfplumber", "PDF processing"),
+    ("docx", "python-docx (Word processing)"),
+    ("easyocr", "EasyOCR (Image OCR)"),
+    ("PIL", "Pillow (Image processing)"),
+    ("yaml", "PyYAML (Configuration)"),
+    ("requests", "HTTP requests"),
+]
+
+OPTIONAL_DEPENDENCIES = [
+    ("openai", "OpenAI API client"),
+]
+
 def check_python_version():
     """Check if Python version is 3.8+"""
     version = sys.version_info
@@ -22,19 +38,46 @@ def check_python_version():
         print(f"❌ Python {version.major}.{version.minor}.{version.micro} - Need Python 3.8+")
         return False
 
-def check_module(module_name, package_name=None):
-    """Check if a Python module can be imported"""
+@functools.lru_cache(maxsize=None)
+def _can_import(module_name):
+    """Try to import a module once; safe to call from worker threads"""
     try:
         importlib.import_module(module_name)
-        print(f"✅ {package_name or module_name} - Available")
         return True
     except ImportError:
+        return False
+
+@functools.lru_cache(maxsize=None)
+def _ollama_list():
+    """Run `ollama list` once, returning (returncode, stdout) or None if unavailable"""
+    try:
+        result = subprocess.run(
+            ["ollama", "list"], 
+            capture_output=True, 
+            text=True, 
+            timeout=10
+        )
+        return result.returncode, result.stdout
+    except (subprocess.TimeoutExpired, FileNotFoundError):
+        return None
+
+def check_module(module_name, package_name=None):
+    """Check if a Python module can be imported"""
+    if _can_import(module_name):
+        print(f"✅ {package_name or module_name} - Available")
+        return True
+    else:
         print(f"❌ {package_name or module_name} - Not available")
         return False
 
+@functools.lru_cache(maxsize=None)
+def _file_exists(filepath):
+    """Check a path once"""
+    return os.path.exists(filepath)
+
 def check_file_exists(filepath):
     """Check if a file exists"""
-    if os.path.exists(filepath):
+    if _file_exists(filepath):
         print(f"✅ {filepath} - Found")
         return True
     else:
@@ -43,32 +86,35 @@ def check_file_exists(filepath):
 
 def check_ollama():
     """Check if Ollama is available"""
-    try:
-        result = subprocess.run(
-            ["ollama", "list"], 
-            capture_output=True, 
-            text=True, 
-            timeout=10
-        )
-        if result.returncode == 0:
-            print("✅ Ollama - Available")
-            models = result.stdout.strip()
-            if "llama" in models.lower():
-                print("✅ Llama model - Found")
-            else:
-                print("⚠️  Llama model - Not found (run: ollama pull llama3.2)")
-            return True
-        else:
-            print("❌ Ollama - Not responding")
-            return False
-    except (subprocess.TimeoutExpired, FileNotFoundError):
+    result = _ollama_list()
+    if result is None:
         print("❌ Ollama - Not installed or not in PATH")
         return False
+    
+    returncode, stdout = result
+    if returncode == 0:
+        print("✅ Ollama - Available")
+        models = stdout.strip()
+        if "llama" in models.lower():
+            print("✅ Llama model - Found")
+        else:
+            print("⚠️  Llama model - Not found (run: ollama pull llama3.2)")
+        return True
+    else:
+        print("❌ Ollama - Not responding")
+        return False
 
 def main():
     print("🔍 DocMineAI - Setup Validation")
     print("=" * 50)
     
+    # Start the slow probes (Ollama subprocess, heavy imports) in the background;
+    # the checks below print their results in order as they complete
+    executor = ThreadPoolExecutor(max_workers=8)
+    executor.submit(_ollama_list)
+    for module, _ in DEPENDENCIES + OPTIONAL_DEPENDENCIES:
+        executor.submit(_can_import, module)
+    
     checks_passed = 0
     total_checks = 0
     
@@ -78,27 +124,14 @@ def main():
         checks_passed += 1
     
     # Check core dependencies
-    dependencies = [
-        ("pdfplumber", "PDF processing"),
-        ("docx", "python-docx (Word processing)"),
-        ("easyocr", "EasyOCR (Image OCR)"),
-        ("PIL", "Pillow (Image processing)"),
-        ("yaml", "PyYAML (Configuration)"),
-        ("requests", "HTTP requests"),
-    ]
-    
-    for module, description in dependencies:
+    for module, description in DEPENDENCIES:
         total_checks += 1
         if check_module(module, description):
             checks_passed += 1
     
     # Check optional dependencies
     print("\\n📦 Optional Dependencies:")
-    optional_deps = [
-        ("openai", "OpenAI API client"),
-    ]
-    
-    for module, description in optional_deps:
+    for module, description in OPTIONAL_DEPENDENCIES:
         check_module(module, description)
     
     # Check framework files
@@ -123,6 +156,8 @@ def main():
     if check_ollama():
         checks_passed += 1
     
+    executor.shutdown(wait=False)
+    
     # Check OpenAI API key
     openai_key = os.environ.get('OPENAI_API_KEY')
     if openai_key:
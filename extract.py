@@ -7,24 +7,33 @@ information from documents using RAG and LLMs.
 """
 
 import argparse
+import asyncio
+import hashlib
+import importlib
 import logging
+import multiprocessing
+import os
 import sys
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime
 import yaml
 
+# Prefer the libyaml-backed dumper when PyYAML was built with it
+try:
+    from yaml import CSafeDumper as _Dumper
+except ImportError:
+    from yaml import SafeDumper as _Dumper
+
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
 from config_manager import ConfigManager, PromptsManager
 from llm_interface import LLMFactory
+from llm_cache import CachedLLM
 from text_processor import TextProcessor, YAMLProcessor
-
-# Import existing document processors
-from processors.pdf_processor import PDFProcessor
-from processors.docx_processor import DocxProcessor
-from processors.image_processor import ImageProcessor
-from utils.file_utils import get_supported_files, validate_file_size
+from utils.file_utils import get_supported_files, validate_file_size, prefetch_files
 
 # Configure logging
 logging.basicConfig(
@@ -33,6 +42,51 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Document processors by file type (txt files are read directly). Imported on
+# first use so pdfplumber/EasyOCR only load when matching files are present.
+PROCESSOR_CLASSES = {
+    'pdf': ('processors.pdf_processor', 'PDFProcessor'),
+    'docx': ('processors.docx_processor', 'DocxProcessor'),
+    'image': ('processors.image_processor', 'ImageProcessor')
+}
+
+# Below this many files a process pool costs more than it saves
+MIN_PARALLEL_FILES = 4
+
+# Processors created inside a pool worker, reused for every file it handles
+_worker_processors = {}
+_worker_config = {}
+
+def _init_file_worker(processor_config: dict):
+    """Store the processor configuration for a pool worker"""
+    global _worker_config
+    _worker_config = processor_config
+
+def create_processor(file_type: str, config: dict = None):
+    """Import and instantiate the processor for a file type"""
+    module_name, class_name = PROCESSOR_CLASSES[file_type]
+    processor_class = getattr(importlib.import_module(module_name), class_name)
+    return processor_class(config)
+
+def _process_one_file(task):
+    """Extract text from one file inside a pool worker"""
+    file_path, file_type, stat = task
+    
+    if file_type not in _worker_processors:
+        # Construction can fail for reasons other than a missing package (model
+        # downloads, reader init); remember the error instead of aborting the pool
+        try:
+            _worker_processors[file_type] = create_processor(file_type, _worker_config)
+        except Exception as e:
+            _worker_processors[file_type] = e
+    
+    processor = _worker_processors[file_type]
+    if isinstance(processor, Exception):
+        return {'file_name': file_path.name, 'success': False,
+                'error': f"{file_type.upper()} processor not available: {processor}"}
+    
+    return processor.process(file_path, stat=stat)
+
 class DocumentRAGExtractor:
     """Main extractor class"""
     
@@ -57,37 +111,48 @@ class DocumentRAGExtractor:
         self.llm = LLMFactory.create_llm(model_config, model_type)
         self.model_type = model_type
         
-        # Initialize document processors
-        self.processors = self._initialize_processors()
+        # Reuse responses for identical prompts across chunks and runs
+        if self.processing_config.get('llm_cache', False):
+            self.llm = CachedLLM(
+                self.llm,
+                cache_dir=self.processing_config.get('llm_cache_dir', '.llm_cache'),
+                ttl=self.processing_config.get('llm_cache_ttl'),
+                semantic_threshold=self.processing_config.get('llm_semantic_threshold')
+            )
         
-        logger.info(f"DocMineAI initialized with {model_type} model")
-    
-    def _initialize_processors(self):
-        """Initialize document processors"""
-        processors = {}
-        
-        try:
-            processors['pdf'] = PDFProcessor()
-            logger.info("PDF processor initialized")
-        except ImportError as e:
-            logger.warning(f"PDF processor not available: {e}")
-        
-        try:
-            processors['docx'] = DocxProcessor()
-            logger.info("DOCX processor initialized")
-        except ImportError as e:
-            logger.warning(f"DOCX processor not available: {e}")
+        # Document processors, created on first use
+        self.processors = {}
         
-        try:
-            processors['image'] = ImageProcessor()
-            logger.info("Image processor initialized")
-        except ImportError as e:
-            logger.warning(f"Image processor not available: {e}")
+        # Extraction worker pool, kept alive across process_documents calls so
+        # each worker loads its processors (EasyOCR models etc.) only once
+        self._file_pool = None
         
-        return processors
+        logger.info(f"DocMineAI initialized with {model_type} model")
+    
+    def _get_processor(self, file_type: str):
+        """Get the processor for a file type, initializing it on first use"""
+        if file_type not in self.processors:
+            try:
+                self.processors[file_type] = create_processor(file_type, self.processing_config)
+                logger.info(f"{file_type.upper()} processor initialized")
+            except ImportError as e:
+                logger.warning(f"{file_type.upper()} processor not available: {e}")
+                self.processors[file_type] = None
+            except Exception as e:
+                logger.error(f"Failed to initialize {file_type.upper()} processor: {e}")
+                self.processors[file_type] = None
+        
+        return self.processors[file_type]
     
     def process_documents(self, docs_dir: str = "docs") -> dict:
         """Process all documents in the specified directory"""
+        extracted_texts = self.extract_texts(docs_dir)
+        
+        # Now extract structured information using LLM
+        return self.extract_information(extracted_texts)
+    
+    def extract_texts(self, docs_dir: str = "docs") -> list:
+        """Extract text from all supported documents in the specified directory"""
         docs_path = Path(docs_dir)
         
         if not docs_path.exists():
@@ -101,10 +166,12 @@ class DocumentRAGExtractor:
             'txt': ['.txt']
         }
         
-        files_by_type = get_supported_files(docs_path, supported_extensions)
+        files_by_type = get_supported_files(docs_path, supported_extensions,
+                                            recursive=self.processing_config.get('recursive', False))
         
         # Process documents to extract text
         extracted_texts = []
+        tasks = []
         
         for file_type, files in files_by_type.items():
             if not files:
@@ -113,107 +180,270 @@ class DocumentRAGExtractor:
             logger.info(f"Processing {len(files)} {file_type} files...")
             
             for file_path in files:
-                logger.info(f"Processing {file_path.name}...")
+                try:
+                    stat = file_path.stat()
+                except OSError as e:
+                    logger.error(f"Error reading {file_path.name}: {e}")
+                    continue
+                
+                if not validate_file_size(file_path, self.processing_config.get('max_file_size_mb', 100), stat=stat):
+                    continue
                 
-                if not validate_file_size(file_path, self.processing_config.get('max_file_size_mb', 100)):
+                if file_type != 'txt':
+                    tasks.append((file_path, file_type, stat))
                     continue
                 
+                # Handle text files directly
+                logger.info(f"Processing {file_path.name}...")
                 try:
-                    if file_type == 'txt':
-                        # Handle text files directly
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            text = f.read()
-                        
-                        extracted_texts.append({
-                            'file_name': file_path.name,
-                            'file_type': file_type,
-                            'text': self.text_processor.clean_text(text)
-                        })
-                    
-                    else:
-                        # Use appropriate processor
-                        processor = self.processors.get(file_type)
-                        if processor:
-                            result = processor.process(file_path)
-                            if result.get('success'):
-                                extracted_texts.append({
-                                    'file_name': file_path.name,
-                                    'file_type': file_type,
-                                    'text': result.get('text_content', '')
-                                })
+                    # Cleaning happens per chunk in TextProcessor.iter_chunks
+                    extracted_texts.append({
+                        'file_name': file_path.name,
+                        'file_type': file_type,
+                        'text': file_path.read_text(encoding='utf-8', errors='replace')
+                    })
                 
                 except Exception as e:
                     logger.error(f"Error processing {file_path.name}: {e}")
         
+        # Use appropriate processor for everything else
+        for (file_path, file_type, _), result in zip(tasks, self._run_processors(tasks)):
+            if result.get('success'):
+                extracted_texts.append({
+                    'file_name': file_path.name,
+                    'file_type': file_type,
+                    'text': result.get('text_content', '')
+                })
+            else:
+                logger.warning(f"Skipping {file_path.name}: {result.get('error')}")
+        
         logger.info(f"Successfully extracted text from {len(extracted_texts)} documents")
+        return extracted_texts
+    
+    def _run_processors(self, tasks: list) -> list:
+        """Run document processors over (file_path, file_type, stat) tasks, returning results in task order"""
+        results = [None] * len(tasks)
         
-        # Now extract structured information using LLM
-        return self.extract_information(extracted_texts)
+        # Images go through batched OCR; ImageProcessor.process_batch sizes its own
+        # worker pool for the OCR device (one process per GPU)
+        image_indices = [i for i, (_, file_type, _) in enumerate(tasks) if file_type == 'image']
+        if image_indices:
+            for i, result in zip(image_indices, self._run_image_processor([tasks[i][0] for i in image_indices])):
+                results[i] = result
+        
+        other_indices = [i for i, (_, file_type, _) in enumerate(tasks) if file_type != 'image']
+        for i, result in zip(other_indices, self._run_file_processors([tasks[i] for i in other_indices])):
+            results[i] = result
+        
+        return results
+    
+    def _run_image_processor(self, file_paths: list) -> list:
+        """Extract text from images with batched OCR"""
+        processor = self._get_processor('image')
+        if not processor:
+            return [{'success': False, 'error': "No processor available for image files"} for _ in file_paths]
+        
+        logger.info(f"Running OCR on {len(file_paths)} images...")
+        try:
+            return processor.process_batch(file_paths)
+        except Exception as e:
+            logger.error(f"Batched OCR failed: {e}")
+            return [{'success': False, 'error': str(e)} for _ in file_paths]
+    
+    def _run_file_processors(self, tasks: list) -> list:
+        """Run PDF/DOCX processors over (file_path, file_type, stat) tasks, in parallel when worthwhile"""
+        if not tasks:
+            return []
+        
+        workers = self.processing_config.get('extraction_workers', max(1, (os.cpu_count() or 1) - 1))
+        
+        if len(tasks) < MIN_PARALLEL_FILES or workers <= 1:
+            # Read upcoming files into the page cache while the current one is parsed
+            prefetch = self.processing_config.get('prefetch_files', 4)
+            prefetch_files([file_path for file_path, _, _ in tasks[:prefetch]])
+            
+            results = []
+            for i, (file_path, file_type, stat) in enumerate(tasks):
+                if prefetch and i + prefetch < len(tasks):
+                    prefetch_files([tasks[i + prefetch][0]])
+                
+                logger.info(f"Processing {file_path.name}...")
+                processor = self._get_processor(file_type)
+                if processor:
+                    results.append(processor.process(file_path, stat=stat))
+                else:
+                    results.append({'success': False, 'error': f"No processor available for {file_type} files"})
+            return results
+        
+        if self._file_pool is None:
+            # Spawn rather than fork, so workers never inherit CUDA or other native state
+            self._file_pool = ProcessPoolExecutor(max_workers=workers,
+                                                  mp_context=multiprocessing.get_context('spawn'),
+                                                  initializer=_init_file_worker,
+                                                  initargs=(self.processing_config,))
+        
+        logger.info(f"Extracting text from {len(tasks)} files with up to {workers} worker processes")
+        chunksize = max(1, min(4, len(tasks) // workers))
+        return list(self._file_pool.map(_process_one_file, tasks, chunksize=chunksize))
+    
+    def close(self):
+        """Shut down the worker pools and release the LLM's connections and cache"""
+        if self._file_pool is not None:
+            self._file_pool.shutdown()
+            self._file_pool = None
+        
+        for processor in self.processors.values():
+            if processor is not None:
+                processor.close()
+        
+        self.llm.close()
     
     def extract_information(self, extracted_texts: list) -> dict:
         """Extract structured information from texts using LLM"""
-        extraction_schema = self.config_manager.get_extraction_schema()
-        extraction_types = list(extraction_schema.keys())
+        results = {'extraction_metadata': self._extraction_metadata(extracted_texts)}
+        extraction_types = results['extraction_metadata']['extraction_types']
         
         logger.info(f"Extracting information for: {extraction_types}")
         
-        results = {
-            'extraction_metadata': {
-                'timestamp': datetime.now().isoformat(),
-                'model_used': self.model_type,
-                'total_documents': len(extracted_texts),
-                'extraction_types': extraction_types
-            }
-        }
-        
         # Initialize result structure
         for extraction_type in extraction_types:
             results[extraction_type] = []
         
-        for doc_info in extracted_texts:
-            logger.info(f"Processing {doc_info['file_name']} for information extraction...")
+        # Send the whole corpus through one request pool
+        for document in self.iter_document_results(extracted_texts, window=len(extracted_texts)):
+            for doc_results in document.values():
+                for extraction_type, values in doc_results.items():
+                    results[extraction_type].extend(values)
+        
+        return results
+    
+    def _extraction_metadata(self, extracted_texts: list) -> dict:
+        """Summary block written at the top of every results file"""
+        return {
+            'timestamp': datetime.now().isoformat(),
+            'model_used': self.model_type,
+            'total_documents': len(extracted_texts),
+            'extraction_types': list(self.config_manager.get_extraction_schema().keys())
+        }
+    
+    def iter_document_results(self, extracted_texts: list, window: int = None):
+        """Yield {file_name: {extraction_type: [...]}} for each document, in order
+        
+        Prompts for `window` documents at a time are sent to the LLM together, so
+        results become available (and can be written out) as each window finishes.
+        """
+        extraction_types = list(self.config_manager.get_extraction_schema().keys())
+        window = max(1, window or self.processing_config.get('stream_window', 8))
+        
+        # Parsed responses by (extraction type, chunk hash), so repeated chunks
+        # (headers, disclaimers, boilerplate) only reach the LLM once per run.
+        # Least recently used entries are dropped between windows to bound memory.
+        parsed_cache = OrderedDict()
+        cache_size = self.processing_config.get('chunk_cache_size', 4096)
+        
+        for start in range(0, len(extracted_texts), window):
+            batch = extracted_texts[start:start + window]
+            document_keys = self._extract_batch(batch, extraction_types, parsed_cache)
             
-            text = doc_info['text']
-            chunks = self.text_processor.chunk_text(text)
+            for doc_info, chunk_keys in zip(batch, document_keys):
+                doc_results = {extraction_type: [] for extraction_type in extraction_types}
+                
+                for key in chunk_keys:
+                    extraction_type = key[0]
+                    parsed_data = parsed_cache[key]
+                    
+                    # Merge into results if data found
+                    if parsed_data and extraction_type in parsed_data:
+                        YAMLProcessor.merge_into(doc_results[extraction_type], parsed_data[extraction_type])
+                
+                yield {doc_info['file_name']: doc_results}
             
-            logger.info(f"  Split into {len(chunks)} chunks")
+            while len(parsed_cache) > cache_size:
+                parsed_cache.popitem(last=False)
+    
+    def _extract_batch(self, extracted_texts: list, extraction_types: list, parsed_cache: OrderedDict) -> list:
+        """Run LLM extraction for a batch of documents, filling parsed_cache
+        
+        Returns the chunk keys of each document, in result order.
+        """
+        min_chunk_length = self.processing_config.get('min_chunk_length', 50)
+        
+        # Chunk keys per document, in result order
+        document_keys = []
+        
+        # Prompts for every (document, extraction type, chunk) go into one pool, so a
+        # long document's chunks don't hold up the rest of the batch
+        pending = {}
+        
+        for doc_info in extracted_texts:
+            logger.info(f"Preparing {doc_info['file_name']} for information extraction...")
             
-            for extraction_type in extraction_types:
-                logger.info(f"  Extracting {extraction_type}...")
+            # Chunks are consumed as they are produced; only their prompts are kept
+            chunk_keys = []
+            chunk_count = 0
+            for i, chunk in enumerate(self.text_processor.iter_chunks(doc_info['text'])):
+                chunk_count += 1
                 
-                type_results = []
+                # Skip small chunks
+                if len(chunk) < min_chunk_length:
+                    continue
                 
-                for i, chunk in enumerate(chunks):
-                    # Skip small chunks
-                    if len(chunk) < self.processing_config.get('min_chunk_length', 50):
+                digest = hashlib.blake2b(chunk.encode('utf-8'), digest_size=16).digest()
+                for extraction_type in extraction_types:
+                    key = (extraction_type, digest)
+                    chunk_keys.append(key)
+                    if key in parsed_cache:
+                        parsed_cache.move_to_end(key)
+                        continue
+                    if key in pending:
                         continue
                     
                     try:
-                        # Format prompt
-                        prompt = self.prompts_manager.format_prompt(extraction_type, chunk)
-                        
-                        # Get LLM response
-                        logger.debug(f"    Processing chunk {i+1}/{len(chunks)}")
-                        response = self.llm.generate(prompt)
-                        
-                        # Parse YAML response
-                        parsed_data = YAMLProcessor.parse_yaml_from_text(response)
-                        
-                        # Add to results if data found
-                        if parsed_data and extraction_type in parsed_data:
-                            type_results.append(parsed_data[extraction_type])
-                    
+                        pending[key] = (doc_info['file_name'], i, self.prompts_manager.format_prompt(extraction_type, chunk), chunk)
                     except Exception as e:
-                        logger.error(f"Error processing chunk {i+1} for {extraction_type}: {e}")
-                        continue
-                
-                # Merge results for this extraction type
-                if type_results:
-                    merged_results = YAMLProcessor.merge_yaml_results([{extraction_type: r} for r in type_results])
-                    if extraction_type in merged_results:
-                        results[extraction_type].extend(merged_results[extraction_type])
+                        logger.error(f"Error formatting prompt for chunk {i+1} of {doc_info['file_name']} for {extraction_type}: {e}")
+                        parsed_cache[key] = None
+            
+            logger.info(f"  Split into {chunk_count} chunks")
+            document_keys.append(chunk_keys)
+        
+        total_chunks = sum(len(chunk_keys) for chunk_keys in document_keys)
+        logger.info(f"Extracting {', '.join(extraction_types)} from {len(pending)} prompts "
+                    f"({total_chunks - len(pending)} duplicate chunks skipped)...")
+        
+        options = {}
+        if isinstance(self.llm, CachedLLM) and self.llm.semantic is not None:
+            # The semantic tier compares chunk text only, within one prompt template
+            # (rendered without a chunk), since template text is shared by every prompt
+            templates = {}
+            semantic_keys = []
+            for (extraction_type, _), (_, _, _, chunk) in pending.items():
+                if extraction_type not in templates:
+                    templates[extraction_type] = self.prompts_manager.format_prompt(extraction_type, '')
+                semantic_keys.append((templates[extraction_type], chunk))
+            options['semantic_keys'] = semantic_keys
+        
+        responses = asyncio.run(self.llm.agenerate_batch(
+            [prompt for _, _, prompt, _ in pending.values()],
+            max_concurrency=self.processing_config.get('llm_concurrency', 8),
+            **options
+        ))
+        
+        for (key, (file_name, i, _, _)), response in zip(pending.items(), responses):
+            extraction_type = key[0]
+            parsed_cache[key] = None
+            
+            if isinstance(response, Exception):
+                logger.error(f"Error processing chunk {i+1} of {file_name} for {extraction_type}: {response}")
+                continue
+            
+            try:
+                # Parse YAML response
+                parsed_cache[key] = YAMLProcessor.parse_yaml_from_text(response)
+            except Exception as e:
+                logger.error(f"Error processing chunk {i+1} of {file_name} for {extraction_type}: {e}")
         
-        return results
+        return document_keys
     
     def save_results(self, results: dict, output_file: str = None) -> str:
         """Save results to YAML file"""
@@ -223,7 +453,33 @@ class DocumentRAGExtractor:
         output_path.parent.mkdir(parents=True, exist_ok=True)
         
         with open(output_path, 'w', encoding='utf-8') as f:
-            yaml.dump(results, f, default_flow_style=False, allow_unicode=True, indent=2)
+            yaml.dump(results, f, Dumper=_Dumper, default_flow_style=False, allow_unicode=True,
+                      indent=2, sort_keys=False)
+        
+        logger.info(f"Results saved to {output_path}")
+        return str(output_path)
+    
+    def save_results_stream(self, extracted_texts: list, output_file: str = None) -> str:
+        """Extract and save results one document at a time as a multi-document YAML file
+        
+        The first YAML document holds the extraction metadata; each following one
+        is {file_name: {extraction_type: [...]}}. Only one window of documents is
+        held in memory and the file can be inspected while the run is in progress.
+        """
+        output_path = Path(output_file or self.general_config.get('output_file', 'output/extracted_data.yaml'))
+        
+        # Ensure output directory exists
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        with open(output_path, 'w', encoding='utf-8') as f:
+            yaml.dump({'extraction_metadata': self._extraction_metadata(extracted_texts)}, f, Dumper=_Dumper,
+                      default_flow_style=False, allow_unicode=True, indent=2, sort_keys=False)
+            
+            for document in self.iter_document_results(extracted_texts):
+                f.write('---\n')
+                yaml.dump(document, f, Dumper=_Dumper, default_flow_style=False, allow_unicode=True,
+                          indent=2, sort_keys=False)
+                f.flush()
         
         logger.info(f"Results saved to {output_path}")
         return str(output_path)
@@ -238,6 +494,8 @@ def main():
     parser.add_argument('--model', choices=['ollama', 'openai'], help='Model type to use')
     parser.add_argument('--output', help='Output file path')
     parser.add_argument('--check-models', action='store_true', help='Check availability of models')
+    parser.add_argument('--stream', action='store_true',
+                        help='Write results per document as they complete (multi-document YAML)')
     parser.add_argument('--verbose', '-v', action='store_true', help='Enable verbose logging')
     
     args = parser.parse_args()
@@ -266,10 +524,23 @@ def main():
         
         # Process documents
         print("🚀 Starting document extraction...")
-        results = extractor.process_documents(args.docs_dir)
         
-        # Save results
-        output_file = extractor.save_results(results, args.output)
+        try:
+            if args.stream:
+                extracted_texts = extractor.extract_texts(args.docs_dir)
+                output_file = extractor.save_results_stream(extracted_texts, args.output)
+                
+                print(f"\n✅ {len(extracted_texts)} documents processed, results saved to: {output_file}")
+                return
+            
+            results = extractor.process_documents(args.docs_dir)
+            
+            # Save results
+            output_file = extractor.save_results(results, args.output)
+        finally:
+            # Worker pools and the LLM (connections, response cache) are released only
+            # after results are written, since streaming extracts while it writes
+            extractor.close()
         
         # Print summary
         print("\n" + "="*60)
@@ -4,19 +4,99 @@ Base processor class and common utilities
 from abc import ABC, abstractmethod
 from typing import Dict, List, Optional, Any
 from pathlib import Path
+import functools
+import hashlib
+import os
+import json
 import logging
+import re
 from datetime import datetime
 
+# Optional faster content hashes, falling back to hashlib
+try:
+    import blake3
+except ImportError:
+    blake3 = None
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+# Optional compression for cache files
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 
+# Common OCR artifacts: form feeds and carriage returns
+_ARTIFACT_TABLE = str.maketrans({'\f': ' ', '\r': ' '})
+# Runs of whitespace other than line breaks
+_WS_RE = re.compile(r'[^\S\n]+')
+# Two or more line breaks (and the blanks around them)
+_MULTI_NL = re.compile(r'\s*\n\s*\n\s*')
+
+
+def _content_hash(file_path: Path) -> str:
+    """Hash file contents with the fastest available algorithm"""
+    if blake3 is not None:
+        hasher = blake3.blake3()
+    elif xxhash is not None:
+        hasher = xxhash.xxh3_128()
+    else:
+        hasher = hashlib.blake2b(digest_size=16)
+    
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+@functools.lru_cache(maxsize=4096)
+def lower_suffix(path: str) -> str:
+    """Lowercased file extension of a path string, memoized for repeated dispatch"""
+    return os.path.splitext(path)[1].lower()
+
+
+def disk_cached(method):
+    """Cache a processor method's JSON-serializable result on disk when use_cache is enabled"""
+    @functools.wraps(method)
+    def wrapper(self, file_path: Path, *args, **kwargs):
+        if not self.config.get('use_cache', False) or args or kwargs:
+            return method(self, file_path, *args, **kwargs)
+        
+        cache_path = self._cache_path(file_path, method.__name__)
+        cached = self._load_cached(cache_path)
+        if cached is not None:
+            return cached['value']
+        
+        value = method(self, file_path)
+        if value:
+            self._store_cached(cache_path, {'value': value})
+        return value
+    return wrapper
+
+
 class BaseProcessor(ABC):
     """Abstract base class for all document processors"""
     
+    # Processing config keys that change extraction output, and so the cache key;
+    # the processing section is shared with the pipeline, whose keys must not count
+    CACHE_CONFIG_KEYS = ()
+    
     def __init__(self, config: Dict[str, Any] = None):
         self.config = config or {}
         self.logger = logging.getLogger(self.__class__.__name__)
         
+        # (file_path, stat_result) for the file currently being processed
+        self._current_stat = None
+        
+        # Content hashes by (path, size, mtime_ns), so each file is read once per version
+        self._content_hashes = {}
+        
     @abstractmethod
     def can_process(self, file_path: Path) -> bool:
         """Check if this processor can handle the given file type"""
@@ -32,20 +112,35 @@ class BaseProcessor(ABC):
         """Extract metadata from the document"""
         pass
         
-    def process(self, file_path: Path) -> Dict[str, Any]:
+    def process(self, file_path: Path, stat: Optional[os.stat_result] = None) -> Dict[str, Any]:
         """Main processing method that combines text extraction and metadata"""
         self.logger.info(f"Processing {file_path.name}")
         
         try:
-            # Extract raw content
-            text = self.extract_text(file_path)
-            metadata = self.extract_metadata(file_path)
+            # Stat once and share it with metadata extraction and cache lookup
+            self._current_stat = (file_path, stat or file_path.stat())
+            
+            cache_path = self._cache_path(file_path, 'process') if self.config.get('use_cache', False) else None
+            cached = self._load_cached(cache_path) if cache_path else None
+            
+            if cached:
+                self.logger.info(f"Using cached extraction for {file_path.name}")
+                # The cache is keyed on contents; size and timestamps belong to this file
+                text = cached['text']
+                metadata = {**cached['metadata'], **self.get_file_info(file_path)}
+            else:
+                # Extract raw content
+                text = self.extract_text(file_path)
+                metadata = self.extract_metadata(file_path)
+                
+                if cache_path and text:
+                    self._store_cached(cache_path, {'text': text, 'metadata': metadata})
             
             # Combine into standard format
             result = {
                 "file_path": str(file_path),
                 "file_name": file_path.name,
-                "file_type": file_path.suffix.lower(),
+                "file_type": lower_suffix(os.fspath(file_path)),
                 "text_content": text,
                 "metadata": metadata,
                 "processed_at": datetime.now().isoformat(),
@@ -62,7 +157,7 @@ class BaseProcessor(ABC):
             return {
                 "file_path": str(file_path),
                 "file_name": file_path.name,
-                "file_type": file_path.suffix.lower(),
+                "file_type": lower_suffix(os.fspath(file_path)),
                 "text_content": "",
                 "metadata": {},
                 "processed_at": datetime.now().isoformat(),
@@ -70,30 +165,90 @@ class BaseProcessor(ABC):
                 "success": False,
                 "error": str(e)
             }
+        
+        finally:
+            self._current_stat = None
+    
+    def _stat(self, file_path: Path) -> os.stat_result:
+        """Stat a file, reusing the result fetched by process() for the current file"""
+        if self._current_stat and self._current_stat[0] == file_path:
+            return self._current_stat[1]
+        return file_path.stat()
+    
+    def _cache_key(self, file_path: Path) -> str:
+        """Cache key from file contents, processor class and output-affecting config"""
+        stat = self._stat(file_path)
+        version = (str(file_path.resolve()), stat.st_size, stat.st_mtime_ns)
+        digest = self._content_hashes.get(version)
+        if digest is None:
+            digest = self._content_hashes[version] = _content_hash(file_path)
+        
+        config = {k: self.config.get(k) for k in self.CACHE_CONFIG_KEYS}
+        config_json = json.dumps(config, sort_keys=True, default=str)
+        config_hash = hashlib.sha1(config_json.encode('utf-8')).hexdigest()[:16]
+        return f"{self.__class__.__name__}-{config_hash}-{digest}"
+    
+    def _cache_path(self, file_path: Path, name: str) -> Path:
+        """Cache file for one cached method of this processor on this file's contents"""
+        cache_dir = Path(self.config.get('cache_dir', '.docmine_cache'))
+        suffix = '.json.zst' if zstandard is not None else '.json'
+        return cache_dir / f"{self._cache_key(file_path)}-{name}{suffix}"
+    
+    def _load_cached(self, cache_path: Path) -> Optional[Dict[str, Any]]:
+        """Load a cached extraction result, if present"""
+        if not cache_path.exists():
+            return None
+        
+        try:
+            data = cache_path.read_bytes()
+            if cache_path.suffix == '.zst':
+                data = zstandard.ZstdDecompressor().decompress(data)
+            return json.loads(data)
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable cache file {cache_path}: {e}")
+            return None
+    
+    def _store_cached(self, cache_path: Path, payload: Dict[str, Any]):
+        """Write an extraction result to the cache"""
+        try:
+            data = json.dumps(payload, ensure_ascii=False, default=str).encode('utf-8')
+            if cache_path.suffix == '.zst':
+                data = zstandard.ZstdCompressor(level=3).compress(data)
+            
+            # Write then rename, so parallel workers never read a partial file
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            self.logger.warning(f"Failed to write cache file {cache_path}: {e}")
     
     def clean_text(self, text: str) -> str:
         """Clean and normalize extracted text"""
         if not text:
             return ""
             
-        # Remove excessive whitespace
-        text = ' '.join(text.split())
-        
         # Remove common OCR artifacts
-        text = text.replace('\f', ' ')  # Form feed
-        text = text.replace('\r', ' ')  # Carriage return
+        text = text.translate(_ARTIFACT_TABLE)
+        
+        # Remove excessive whitespace, keeping line breaks
+        text = _WS_RE.sub(' ', text)
         
         # Normalize line breaks
-        text = text.replace('\n\n\n', '\n\n')
+        text = _MULTI_NL.sub('\n\n', text)
         
         return text.strip()
     
     def get_file_info(self, file_path: Path) -> Dict[str, Any]:
         """Get basic file information"""
-        stat = file_path.stat()
+        stat = self._stat(file_path)
         return {
             "size_bytes": stat.st_size,
             "size_mb": round(stat.st_size / (1024 * 1024), 2),
             "created": datetime.fromtimestamp(stat.st_ctime).isoformat(),
             "modified": datetime.fromtimestamp(stat.st_mtime).isoformat(),
-        }
\ No newline at end of file
+        }
+    
+    def close(self):
+        """Release resources kept between files (nothing by default)"""
+        pass
\ No newline at end of file
@@ -2,20 +2,32 @@
 DOCX document processor using python-docx for Word document extraction
 """
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+import io
 import logging
+import os
 
 try:
     from docx import Document
     from docx.oxml.table import CT_Tbl
     from docx.oxml.text.paragraph import CT_P
-    from docx.table import Table, _Cell
+    from docx.table import Table
     from docx.text.paragraph import Paragraph
 except ImportError:
     Document = None
     logging.warning("python-docx not installed. Run: pip install python-docx")
 
-from .base_processor import BaseProcessor
+from .base_processor import BaseProcessor, disk_cached, lower_suffix
+
+# File suffixes handled by this processor
+_DOCX_SUFFIXES = frozenset({'.docx', '.doc'})
+
+def _heading_level(style_name: str) -> Optional[int]:
+    """Heading level for a paragraph style name ('Heading 2' -> 2), or None if not a heading"""
+    if not style_name.startswith('Heading'):
+        return None
+    level = style_name.replace('Heading ', '')
+    return int(level) if level.isdigit() else 1
 
 class DocxProcessor(BaseProcessor):
     """Processor for DOCX documents with structure preservation"""
@@ -25,47 +37,18 @@ class DocxProcessor(BaseProcessor):
         
         if Document is None:
             raise ImportError("python-docx is required for DOCX processing. Install with: pip install python-docx")
+        
+        # Parsed body of the most recent document, keyed by (path, size, mtime_ns)
+        self._docx_cache = {}
     
     def can_process(self, file_path: Path) -> bool:
         """Check if file is a DOCX"""
-        return file_path.suffix.lower() in ['.docx', '.doc']
+        return lower_suffix(os.fspath(file_path)) in _DOCX_SUFFIXES
     
     def extract_text(self, file_path: Path) -> str:
         """Extract text from DOCX preserving structure"""
         try:
-            doc = Document(file_path)
-            text_content = []
-            
-            # Process document elements in order
-            for element in doc.element.body:
-                if isinstance(element, CT_P):
-                    # Paragraph
-                    paragraph = Paragraph(element, doc)
-                    if paragraph.text.strip():
-                        # Check if it's a heading style
-                        if paragraph.style.name.startswith('Heading'):
-                            level = paragraph.style.name.replace('Heading ', '')
-                            text_content.append(f"{'#' * int(level if level.isdigit() else 1)} {paragraph.text}")
-                        else:
-                            text_content.append(paragraph.text)
-                
-                elif isinstance(element, CT_Tbl):
-                    # Table
-                    table = Table(element, doc)
-                    text_content.append("--- Table ---")
-                    
-                    for row in table.rows:
-                        row_text = []
-                        for cell in row.cells:
-                            cell_text = cell.text.strip().replace('\n', ' ')
-                            row_text.append(cell_text)
-                        if any(row_text):  # Only add non-empty rows
-                            text_content.append(" | ".join(row_text))
-                    
-                    text_content.append("--- End Table ---")
-            
-            full_text = "\n".join(text_content)
-            return self.clean_text(full_text)
+            return self.clean_text(self._parse_once(file_path)["text"])
             
         except Exception as e:
             self.logger.error(f"Error extracting text from DOCX {file_path}: {e}")
@@ -76,44 +59,17 @@ class DocxProcessor(BaseProcessor):
         metadata = self.get_file_info(file_path)
         
         try:
-            doc = Document(file_path)
+            parsed = self._parse_once(file_path)
             
             # Core properties
-            core_props = doc.core_properties
-            metadata.update({
-                "title": core_props.title or "",
-                "author": core_props.author or "",
-                "subject": core_props.subject or "",
-                "category": core_props.category or "",
-                "comments": core_props.comments or "",
-                "keywords": core_props.keywords or "",
-                "language": core_props.language or "",
-                "last_modified_by": core_props.last_modified_by or "",
-                "created": core_props.created.isoformat() if core_props.created else "",
-                "modified": core_props.modified.isoformat() if core_props.modified else "",
-            })
+            metadata.update(parsed["core_props"])
             
             # Document structure analysis
-            paragraphs = len(doc.paragraphs)
-            tables = len(doc.tables)
-            
-            # Count headings
-            heading_count = 0
-            for paragraph in doc.paragraphs:
-                if paragraph.style.name.startswith('Heading'):
-                    heading_count += 1
-            
-            # Count images (embedded objects)
-            image_count = 0
-            for rel in doc.part.rels.values():
-                if "image" in rel.target_ref:
-                    image_count += 1
-            
             metadata.update({
-                "paragraphs": paragraphs,
-                "tables": tables,
-                "headings": heading_count,
-                "images": image_count,
+                "paragraphs": parsed["paragraph_count"],
+                "tables": len(parsed["tables"]),
+                "headings": len(parsed["headings"]),
+                "images": parsed["image_count"],
             })
             
         except Exception as e:
@@ -122,46 +78,110 @@ class DocxProcessor(BaseProcessor):
         
         return metadata
     
+    @disk_cached
     def extract_tables(self, file_path: Path) -> List[List[List[str]]]:
         """Extract tables from DOCX as structured data"""
-        tables = []
-        
         try:
-            doc = Document(file_path)
-            
-            for table in doc.tables:
-                table_data = []
-                for row in table.rows:
-                    row_data = []
-                    for cell in row.cells:
-                        cell_text = cell.text.strip()
-                        row_data.append(cell_text)
-                    table_data.append(row_data)
-                tables.append(table_data)
+            return [[list(row) for row in table] for table in self._parse_once(file_path)["tables"]]
                 
         except Exception as e:
             self.logger.error(f"Error extracting tables from DOCX {file_path}: {e}")
-        
-        return tables
+            return []
     
+    @disk_cached
     def extract_headings(self, file_path: Path) -> List[Dict[str, Any]]:
         """Extract document structure based on headings"""
-        headings = []
-        
         try:
-            doc = Document(file_path)
-            
-            for i, paragraph in enumerate(doc.paragraphs):
-                if paragraph.style.name.startswith('Heading'):
-                    level = paragraph.style.name.replace('Heading ', '')
-                    headings.append({
-                        "text": paragraph.text,
-                        "level": int(level) if level.isdigit() else 1,
-                        "style": paragraph.style.name,
-                        "position": i
-                    })
+            return [dict(heading) for heading in self._parse_once(file_path)["headings"]]
                     
         except Exception as e:
             self.logger.error(f"Error extracting headings from DOCX {file_path}: {e}")
+            return []
+    
+    def _parse_once(self, file_path: Path) -> Dict[str, Any]:
+        """Open the document once and gather text, tables, headings and counts in one body walk"""
+        stat = self._stat(file_path)
+        key = (str(file_path.resolve()), stat.st_size, stat.st_mtime_ns)
+        if key in self._docx_cache:
+            return self._docx_cache[key]
+        
+        doc = Document(file_path)
+        buf = io.StringIO()
+        tables = []
+        headings = []
+        paragraph_count = 0
+        styles = {}
+        
+        # Process document elements in order
+        for element in doc.element.body:
+            if isinstance(element, CT_P):
+                # Paragraph
+                paragraph = Paragraph(element, doc)
+                paragraph_text = paragraph.text
+                
+                # Resolve each style once per document (by pStyle id)
+                style_id = element.style
+                style = styles.get(style_id)
+                if style is None:
+                    style_name = paragraph.style.name
+                    style = styles[style_id] = (style_name, _heading_level(style_name))
+                style_name, level = style
+                is_heading = level is not None
+                
+                if is_heading:
+                    headings.append({
+                        "text": paragraph_text,
+                        "level": level,
+                        "style": style_name,
+                        "position": paragraph_count
+                    })
+                
+                if paragraph_text.strip():
+                    # Headings become markdown-style lines
+                    if is_heading:
+                        buf.write('#' * level)
+                        buf.write(' ')
+                    buf.write(paragraph_text)
+                    buf.write('\n')
+                paragraph_count += 1
+            
+            elif isinstance(element, CT_Tbl):
+                # Table
+                table_data = [[cell.text.strip() for cell in row.cells] for row in Table(element, doc).rows]
+                tables.append(table_data)
+                
+                buf.write("--- Table ---\n")
+                for row_data in table_data:
+                    if any(row_data):  # Only add non-empty rows
+                        for j, cell in enumerate(row_data):
+                            if j:
+                                buf.write(" | ")
+                            buf.write(cell.replace('\n', ' '))
+                        buf.write('\n')
+                buf.write("--- End Table ---\n")
+        
+        core_props = doc.core_properties
+        parsed = {
+            "text": buf.getvalue(),
+            "tables": tables,
+            "headings": headings,
+            "paragraph_count": paragraph_count,
+            # Count images (embedded objects)
+            "image_count": sum(1 for rel in doc.part.rels.values() if "image" in rel.target_ref),
+            "core_props": {
+                "title": core_props.title or "",
+                "author": core_props.author or "",
+                "subject": core_props.subject or "",
+                "category": core_props.category or "",
+                "comments": core_props.comments or "",
+                "keywords": core_props.keywords or "",
+                "language": core_props.language or "",
+                "last_modified_by": core_props.last_modified_by or "",
+                "created": core_props.created.isoformat() if core_props.created else "",
+                "modified": core_props.modified.isoformat() if core_props.modified else "",
+            },
+        }
         
-        return headings
\ No newline at end of file
+        # Keep only the most recent document; process() calls all methods on one file in turn
+        self._docx_cache = {key: parsed}
+        return parsed
@@ -1,14 +1,22 @@
 """
 Image processor with OCR capabilities using EasyOCR
 """
+from collections import OrderedDict
+from contextlib import ExitStack
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 import logging
+import math
+import multiprocessing
+import os
 import ssl
 import urllib.request
 
 try:
     import easyocr
+    import numpy as np
     from PIL import Image
     EASYOCR_AVAILABLE = True
 except ImportError:
@@ -17,11 +25,137 @@ except ImportError:
     EASYOCR_AVAILABLE = False
     logging.warning("easyocr or Pillow not installed. Run: pip install easyocr Pillow")
 
-from .base_processor import BaseProcessor
+# Optional libjpeg-turbo bindings for faster JPEG decoding
+try:
+    from turbojpeg import TurboJPEG, TJPF_RGB
+except ImportError:
+    TurboJPEG = None
+
+from .base_processor import BaseProcessor, lower_suffix
+
+# File suffixes handled by this processor
+_IMAGE_SUFFIXES = frozenset({'.png', '.jpg', '.jpeg', '.bmp', '.tiff', '.gif'})
+_JPEG_SUFFIXES = frozenset({'.jpg', '.jpeg'})
+
+def _select_device(requested: str = 'auto') -> str:
+    """Pick the OCR device: 'cuda', 'mps' or 'cpu'"""
+    if requested == 'cpu':
+        return 'cpu'
+    
+    try:
+        import torch
+    except ImportError:
+        return 'cpu'
+    
+    if requested in ('auto', 'cuda') and torch.cuda.is_available():
+        return 'cuda'
+    
+    mps = getattr(torch.backends, 'mps', None)
+    if requested in ('auto', 'mps') and mps is not None and mps.is_available():
+        return 'mps'
+    
+    return 'cpu'
+
+def _is_out_of_memory(error: Exception) -> bool:
+    """True for CUDA/MPS out-of-memory errors (torch raises RuntimeError subclasses)"""
+    return isinstance(error, RuntimeError) and 'out of memory' in str(error).lower()
+
+def _select_precision(requested: str, device: str) -> str:
+    """Pick the OCR precision ('fp32', 'fp16' or 'bf16') supported on the device"""
+    if requested == 'auto':
+        requested = 'fp16' if device == 'cuda' else 'bf16' if device == 'cpu' else 'fp32'
+    
+    if requested == 'fp16' and device == 'cuda':
+        return 'fp16'
+    
+    if requested == 'bf16':
+        try:
+            import torch
+        except ImportError:
+            return 'fp32'
+        
+        if device == 'cuda' and torch.cuda.is_bf16_supported():
+            return 'bf16'
+        # Only worth it with native bf16 instructions (AVX512-BF16 / AMX)
+        if device == 'cpu' and torch.backends.mkldnn.is_available() and torch.ops.mkldnn._is_mkldnn_bf16_supported():
+            return 'bf16'
+    
+    return 'fp32'
+
+def _gpu_arch() -> str:
+    """CUDA compute capability of the current GPU, e.g. 'sm86'"""
+    import torch
+    major, minor = torch.cuda.get_device_capability()
+    return f"sm{major}{minor}"
+
+def _to_float32(output):
+    """Cast reduced-precision tensors (alone or in a tuple/list) back to float32"""
+    if isinstance(output, (tuple, list)):
+        return type(output)(_to_float32(item) for item in output)
+    if hasattr(output, 'is_floating_point') and output.is_floating_point():
+        return output.float()
+    return output
+
+class _TensorRTDetector:
+    """Drop-in for EasyOCR's CRAFT detector that runs a TensorRT-compiled module"""
+    
+    def __init__(self, module):
+        self.module = module
+    
+    def __call__(self, x):
+        return _to_float32(self.module(x))
+    
+    def eval(self):
+        return self
+
+class _Float32Outputs:
+    """Wraps an EasyOCR model so it returns float32 when run under autocast
+    
+    EasyOCR passes model outputs to OpenCV and NumPy, which reject float16
+    (cv2.threshold in getDetBoxes_core) and bfloat16 (Tensor.numpy) arrays.
+    """
+    
+    def __init__(self, model):
+        self.model = model
+    
+    def __call__(self, *args, **kwargs):
+        return _to_float32(self.model(*args, **kwargs))
+    
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+def _set_torch_threads(threads: int) -> Optional[int]:
+    """Set torch's intra-op thread count, returning the previous one (None without torch)"""
+    try:
+        import torch
+    except ImportError:
+        return None
+    
+    previous = torch.get_num_threads()
+    torch.set_num_threads(max(1, threads))
+    return previous
+
+# ImageProcessor (and its EasyOCR reader) created once per process_batch worker
+_worker_processor = None
+
+def _init_ocr_worker(config: Dict[str, Any], threads: Optional[int] = None):
+    """Create the worker's ImageProcessor, so the reader is built once per process"""
+    global _worker_processor
+    # On CPU each OCR process gets its share of the cores instead of all of them
+    if threads:
+        _set_torch_threads(threads)
+    _worker_processor = ImageProcessor(config)
+
+def _process_ocr_chunk(file_paths: List[Path]) -> List[Dict[str, Any]]:
+    """Process a chunk of images inside a process_batch worker"""
+    return _worker_processor._process_chunk(file_paths)
 
 class ImageProcessor(BaseProcessor):
     """Processor for images with OCR text extraction"""
     
+    CACHE_CONFIG_KEYS = ('ocr_languages', 'confidence_threshold', 'ocr_max_side', 'ocr_backend',
+                         'ocr_precision', 'include_exif')
+    
     def __init__(self, config: Dict[str, Any] = None):
         super().__init__(config)
         
@@ -31,23 +165,170 @@ class ImageProcessor(BaseProcessor):
         # Initialize OCR reader (this may take time on first run)
         self.ocr_languages = config.get('ocr_languages', ['en']) if config else ['en']
         self.confidence_threshold = config.get('confidence_threshold', 0.7) if config else 0.7
+        self.ocr_batch_size = self.config.get('ocr_batch_size', 16)
+        self.ocr_batch_height = self.config.get('ocr_batch_height', 600)
+        
+        # Raw readtext results per image (LRU), shared by all extraction methods.
+        # Always keep at least the current image so process() runs OCR only once.
+        self.ocr_cache_size = max(1, self.config.get('ocr_cache_size', 64))
+        self._ocr_cache = OrderedDict()
+        
+        # process_batch worker pool, kept across calls so readers stay loaded
+        self._pool = None
+        self._pool_workers = 0
+        
+        # SIMD JPEG decoder (None if PyTurboJPEG or libjpeg-turbo is missing)
+        self._turbojpeg = None
+        if TurboJPEG is not None:
+            try:
+                self._turbojpeg = TurboJPEG()
+            except Exception as e:
+                self.logger.warning(f"libjpeg-turbo not available, using default JPEG decoding: {e}")
+        
+        # 'auto' picks CUDA, then Apple MPS, then CPU; use_gpu: false forces CPU
+        requested_device = self.config.get('device', 'auto') if self.config.get('use_gpu', True) else 'cpu'
+        self.device = _select_device(requested_device)
+        if requested_device not in ('auto', self.device):
+            self.logger.warning(f"OCR device '{requested_device}' not available, using {self.device}")
         
         try:
             # Fix SSL certificate verification issue on macOS
             self._fix_ssl_context()
             
-            self.reader = easyocr.Reader(self.ocr_languages)
-            self.logger.info(f"EasyOCR initialized with languages: {self.ocr_languages}")
+            self.reader = self._create_reader()
+            self.logger.info(f"EasyOCR initialized with languages: {self.ocr_languages} on {self.device}")
         except Exception as e:
             self.logger.error(f"Failed to initialize EasyOCR: {e}")
             self.logger.info("Trying fallback initialization...")
             try:
                 # Try with minimal configuration
-                self.reader = easyocr.Reader(['en'], verbose=False)
+                self.reader = easyocr.Reader(['en'], gpu=False, verbose=False)
+                self.device = 'cpu'
                 self.logger.info("EasyOCR initialized with fallback settings")
             except Exception as e2:
                 self.logger.error(f"Fallback initialization also failed: {e2}")
                 raise
+        
+        # Largest detector batch the OCR backend accepts (set by the TensorRT engine)
+        self._detector_max_batch = None
+        if self.config.get('ocr_backend', 'torch') == 'tensorrt':
+            self._enable_tensorrt()
+        
+        # Reduced precision is opt-in: 'fp16', 'bf16' or 'auto' (best supported on the device)
+        requested_precision = self.config.get('ocr_precision', 'fp32')
+        try:
+            self.ocr_precision = _select_precision(requested_precision, self.device)
+        except Exception as e:
+            self.logger.warning(f"Could not check OCR precision support: {e}")
+            self.ocr_precision = 'fp32'
+        if requested_precision not in ('auto', 'fp32', self.ocr_precision):
+            self.logger.warning(f"OCR precision '{requested_precision}' not supported on {self.device}, using {self.ocr_precision}")
+        
+        if self.ocr_precision != 'fp32':
+            # Weights stay FP32 and autocast runs the heavy layers at reduced precision;
+            # outputs are cast back before EasyOCR's OpenCV/NumPy post-processing
+            self.reader.detector = _Float32Outputs(self.reader.detector)
+            self.reader.recognizer = _Float32Outputs(self.reader.recognizer)
+        
+        self._warmup()
+    
+    def _enable_tensorrt(self):
+        """Swap the CRAFT detector for an FP16 TensorRT module, cached per GPU architecture
+        
+        The recognizer stays on PyTorch: its forward takes a second text tensor and
+        variable-width crops, which gain little from a static engine.
+        """
+        if self.device != 'cuda':
+            self.logger.warning(f"ocr_backend 'tensorrt' needs CUDA, using PyTorch on {self.device}")
+            return
+        
+        try:
+            import torch
+            import torch_tensorrt
+        except ImportError:
+            self.logger.warning("torch-tensorrt not installed, using PyTorch OCR backend. Run: pip install torch-tensorrt")
+            return
+        
+        try:
+            cache_dir = Path(self.config.get('cache_dir', '.docmine_cache'))
+            engine_path = cache_dir / f"craft_{_gpu_arch()}_fp16_b{self.ocr_batch_size}.ts"
+            
+            if engine_path.exists():
+                trt_module = torch.jit.load(str(engine_path))
+            else:
+                self.logger.info("Building TensorRT engine for the OCR detector (first run only)")
+                detector = getattr(self.reader.detector, 'module', self.reader.detector).eval()
+                
+                # Detector inputs are (N, 3, H, W) with H and W multiples of 32
+                max_side = self.config.get('ocr_max_side', 2560)
+                opt_height = -(-self.ocr_batch_height // 32) * 32
+                example = torch.zeros(1, 3, opt_height, opt_height * 4 // 3 // 32 * 32, device='cuda')
+                with torch.no_grad():
+                    traced = torch.jit.trace(detector, example, strict=False)
+                
+                trt_module = torch_tensorrt.compile(
+                    traced,
+                    ir='ts',
+                    inputs=[torch_tensorrt.Input(
+                        min_shape=(1, 3, 32, 32),
+                        opt_shape=(self.ocr_batch_size, 3, opt_height, opt_height * 4 // 3 // 32 * 32),
+                        max_shape=(self.ocr_batch_size, 3, max_side, max_side),
+                        dtype=torch.float32
+                    )],
+                    enabled_precisions={torch.float16}
+                )
+                cache_dir.mkdir(parents=True, exist_ok=True)
+                torch.jit.save(trt_module, str(engine_path))
+            
+            self.reader.detector = _TensorRTDetector(trt_module)
+            self._detector_max_batch = self.ocr_batch_size
+            self.logger.info(f"OCR detector running on TensorRT ({engine_path.name})")
+        except Exception as e:
+            self.logger.warning(f"TensorRT OCR backend unavailable, using PyTorch: {e}")
+    
+    def _create_reader(self):
+        """Create the EasyOCR reader on the selected device, falling back to CPU"""
+        if self.device == 'cpu':
+            return easyocr.Reader(self.ocr_languages, gpu=False)
+        
+        try:
+            if self.device == 'cuda' and self.config.get('gpu_memory_limit'):
+                import torch
+                torch.cuda.set_per_process_memory_fraction(self.config['gpu_memory_limit'])
+            
+            # cudnn.benchmark picks the fastest kernels for the (fixed) batch input sizes
+            return easyocr.Reader(self.ocr_languages, gpu=self.device, cudnn_benchmark=self.device == 'cuda')
+        except Exception as e:
+            self.logger.warning(f"Failed to initialize EasyOCR on {self.device}, falling back to CPU: {e}")
+            self.device = 'cpu'
+            return easyocr.Reader(self.ocr_languages, gpu=False)
+    
+    def _ocr_context(self) -> ExitStack:
+        """Context for running the OCR models: inference mode plus autocast at reduced precision"""
+        stack = ExitStack()
+        try:
+            import torch
+        except ImportError:
+            return stack
+        
+        stack.enter_context(torch.inference_mode())
+        if self.ocr_precision != 'fp32':
+            dtype = torch.float16 if self.ocr_precision == 'fp16' else torch.bfloat16
+            stack.enter_context(torch.autocast(device_type=self.device, dtype=dtype))
+        return stack
+    
+    def _warmup(self):
+        """Run one dummy batch so CUDA kernels are ready before the first real image"""
+        if self.device == 'cpu':
+            return
+        
+        try:
+            dummy = np.zeros([self.ocr_batch_size, self.ocr_batch_height, self.ocr_batch_height * 4 // 3, 3], dtype=np.uint8)
+            with self._ocr_context():
+                self.reader.readtext_batched(dummy, batch_size=self.ocr_batch_size)
+            self.logger.info("EasyOCR warmed up")
+        except Exception as e:
+            self.logger.warning(f"EasyOCR warmup failed: {e}")
     
     def _fix_ssl_context(self):
         """Fix SSL certificate verification issues on macOS"""
@@ -60,29 +341,202 @@ class ImageProcessor(BaseProcessor):
     
     def can_process(self, file_path: Path) -> bool:
         """Check if file is a supported image format"""
-        return file_path.suffix.lower() in ['.png', '.jpg', '.jpeg', '.bmp', '.tiff', '.gif']
+        return lower_suffix(os.fspath(file_path)) in _IMAGE_SUFFIXES
+    
+    def _load_image(self, file_path: Path):
+        """OCR input for an image: a turbojpeg-decoded RGB array for JPEGs, else the path"""
+        path = os.fspath(file_path)
+        if self._turbojpeg is None or lower_suffix(path) not in _JPEG_SUFFIXES:
+            return path
+        
+        try:
+            with open(path, 'rb') as f:
+                return self._turbojpeg.decode(f.read(), pixel_format=TJPF_RGB)
+        except Exception as e:
+            # e.g. CMYK or truncated files: let EasyOCR decode them
+            self.logger.debug(f"turbojpeg could not decode {file_path}: {e}")
+            return path
+    
+    def _run_ocr(self, file_path: Path) -> List[Tuple[Any, str, float]]:
+        """Run OCR on an image, reusing a cached result when available"""
+        key = os.fspath(file_path)
+        
+        results = self._ocr_cache.get(key)
+        if results is None:
+            with self._ocr_context():
+                results = self.reader.readtext(self._load_image(file_path), detail=1)
+            self._cache_ocr(key, results)
+        else:
+            self._ocr_cache.move_to_end(key)
+        
+        return results
+    
+    def _cache_ocr(self, key: str, results: List[Tuple[Any, str, float]]):
+        """Store OCR results, evicting the least recently used images"""
+        self._ocr_cache[key] = results
+        self._ocr_cache.move_to_end(key)
+        
+        while len(self._ocr_cache) > self.ocr_cache_size:
+            self._ocr_cache.popitem(last=False)
+    
+    def _text_from_ocr(self, results: List[Tuple[Any, str, float]]) -> str:
+        """Join OCR detections that meet the confidence threshold"""
+        # Filter by confidence and extract text
+        text_parts = []
+        for (bbox, text, confidence) in results:
+            if confidence >= self.confidence_threshold:
+                text_parts.append(text)
+                self.logger.debug(f"OCR: '{text}' (confidence: {confidence:.2f})")
+        
+        # Join text parts with spaces
+        full_text = " ".join(text_parts)
+        return self.clean_text(full_text)
     
     def extract_text(self, file_path: Path) -> str:
         """Extract text from image using OCR"""
         try:
-            # Perform OCR
-            results = self.reader.readtext(str(file_path))
-            
-            # Filter by confidence and extract text
-            text_parts = []
-            for (bbox, text, confidence) in results:
-                if confidence >= self.confidence_threshold:
-                    text_parts.append(text)
-                    self.logger.debug(f"OCR: '{text}' (confidence: {confidence:.2f})")
-            
-            # Join text parts with spaces
-            full_text = " ".join(text_parts)
-            return self.clean_text(full_text)
+            return self._text_from_ocr(self._run_ocr(file_path))
             
         except Exception as e:
             self.logger.error(f"Error extracting text from image {file_path}: {e}")
             return ""
     
+    def extract_text_batch(self, file_paths: List[Path]) -> Dict[Path, str]:
+        """Extract text from many images, running OCR in batches on the GPU/CPU
+        
+        Images are grouped by aspect ratio and resized to a common size per group
+        so readtext_batched can stack them, at most ocr_batch_size images per call.
+        Bounding boxes are scaled back to the original image size before caching.
+        """
+        ocr_results = {}
+        groups = {}
+        
+        for file_path in file_paths:
+            cached = self._ocr_cache.get(os.fspath(file_path))
+            if cached is not None:
+                ocr_results[file_path] = cached
+                continue
+            
+            try:
+                with Image.open(file_path) as img:
+                    width, height = img.size
+            except Exception as e:
+                self.logger.error(f"Error reading image {file_path}: {e}")
+                continue
+            
+            # Snap aspect ratio to quarter steps so similar images share a batch
+            aspect = max(0.25, round(width / height * 4) / 4)
+            n_height = self.ocr_batch_height
+            n_width = int(n_height * aspect)
+            groups.setdefault((n_width, n_height), []).append((file_path, width, height))
+        
+        for (n_width, n_height), items in groups.items():
+            # readtext_batched stacks every image it gets into one detector pass,
+            # so feed it at most ocr_batch_size images (and no more than the
+            # TensorRT engine's max_shape batch) at a time
+            slice_size = min(self.ocr_batch_size, self._detector_max_batch or self.ocr_batch_size)
+            start = 0
+            while start < len(items):
+                batch = items[start:start + slice_size]
+                try:
+                    images = [self._load_image(file_path) for file_path, _, _ in batch]
+                    with self._ocr_context():
+                        batch_results = self.reader.readtext_batched(
+                            images,
+                            n_width=n_width,
+                            n_height=n_height,
+                            batch_size=slice_size
+                        )
+                except Exception as e:
+                    # Out of GPU memory: retry this slice at half the size
+                    if _is_out_of_memory(e) and slice_size > 1:
+                        slice_size //= 2
+                        self.logger.warning(f"OCR ran out of memory, retrying with {slice_size} images per batch")
+                        continue
+                    self.logger.error(f"Batched OCR failed for {len(batch)} images: {e}")
+                    start += len(batch)
+                    continue
+                
+                for (file_path, width, height), results in zip(batch, batch_results):
+                    results = self._rescale_bboxes(results, width / n_width, height / n_height)
+                    self._cache_ocr(os.fspath(file_path), results)
+                    ocr_results[file_path] = results
+                start += len(batch)
+        
+        return {
+            file_path: self._text_from_ocr(ocr_results[file_path]) if file_path in ocr_results else ""
+            for file_path in file_paths
+        }
+    
+    def process_batch(self, file_paths: List[Path], workers: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Process many images, spreading batched OCR across worker processes
+        
+        The first chunk runs on this process's reader and the rest on a pool of
+        workers - 1 processes, each building one EasyOCR reader. The pool is kept
+        until close(). Workers default to extraction_workers (CPU count - 1) on
+        CPU, sharing the cores between them, and to one on a GPU (set ocr_workers
+        to share a GPU between several).
+        """
+        if workers is None:
+            cpu_workers = self.config.get('extraction_workers', max(1, (os.cpu_count() or 1) - 1))
+            workers = self.config.get('ocr_workers', cpu_workers if self.device == 'cpu' else 1)
+        
+        # Chunks must fit the OCR cache, so process() reuses the batched results
+        chunk_size = max(1, min(self.ocr_cache_size, math.ceil(len(file_paths) / max(1, workers))))
+        chunks = [file_paths[i:i + chunk_size] for i in range(0, len(file_paths), chunk_size)]
+        
+        if workers <= 1 or len(chunks) <= 1:
+            return [result for chunk in chunks for result in self._process_chunk(chunk)]
+        
+        threads = max(1, (os.cpu_count() or 1) // workers) if self.device == 'cpu' else None
+        if self._pool is None or self._pool_workers != workers:
+            self.close()
+            # Spawn rather than fork: CUDA state cannot be shared with forked children
+            self._pool = ProcessPoolExecutor(
+                max_workers=workers - 1,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_ocr_worker,
+                initargs=(self.config, threads)
+            )
+            self._pool_workers = workers
+        
+        futures = [self._pool.submit(_process_ocr_chunk, chunk) for chunk in chunks[1:]]
+        previous_threads = _set_torch_threads(threads) if threads else None
+        try:
+            results = self._process_chunk(chunks[0])
+        finally:
+            if previous_threads is not None:
+                _set_torch_threads(previous_threads)
+        
+        try:
+            for future in futures:
+                results.extend(future.result())
+        except BrokenProcessPool:
+            # A worker died: drop the pool so the next call starts a fresh one
+            self.close()
+            raise
+        return results
+    
+    def _process_chunk(self, file_paths: List[Path]) -> List[Dict[str, Any]]:
+        """Run batched OCR for a chunk of images, then process each from the OCR cache"""
+        self.extract_text_batch(file_paths)
+        return [self.process(file_path) for file_path in file_paths]
+    
+    def close(self):
+        """Shut down the process_batch worker pool"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+            self._pool_workers = 0
+    
+    @staticmethod
+    def _rescale_bboxes(results: List[Tuple[Any, str, float]], scale_x: float, scale_y: float) -> List[Tuple[Any, str, float]]:
+        """Map bounding boxes from a resized image back to original coordinates"""
+        return [
+            ([[x * scale_x, y * scale_y] for x, y in bbox], text, confidence)
+            for bbox, text, confidence in results
+        ]
+    
     def extract_metadata(self, file_path: Path) -> Dict[str, Any]:
         """Extract metadata from image file"""
         metadata = self.get_file_info(file_path)
@@ -98,17 +552,19 @@ class ImageProcessor(BaseProcessor):
                     "has_transparency": img.mode in ('RGBA', 'LA') or 'transparency' in img.info,
                 })
                 
-                # Get EXIF data if available
-                if hasattr(img, '_getexif') and img._getexif():
-                    exif_data = img._getexif()
-                    metadata["exif"] = {k: str(v) for k, v in exif_data.items() if v is not None}
+                # Get EXIF data if requested (getexif decodes lazily)
+                if self.config.get('include_exif', False):
+                    exif_data = img.getexif()
+                    if exif_data:
+                        metadata["exif"] = {k: str(v) for k, v in exif_data.items() if v is not None}
             
-            # OCR-specific metadata
-            ocr_results = self.reader.readtext(str(file_path), detail=1)
+            # OCR-specific metadata (shares the OCR pass with extract_text)
+            ocr_results = self._run_ocr(file_path)
             
             total_detections = len(ocr_results)
-            high_confidence_detections = sum(1 for _, _, conf in ocr_results if conf >= self.confidence_threshold)
-            avg_confidence = sum(conf for _, _, conf in ocr_results) / total_detections if total_detections > 0 else 0
+            confidences = np.fromiter((conf for _, _, conf in ocr_results), dtype=np.float64, count=total_detections)
+            high_confidence_detections = int((confidences >= self.confidence_threshold).sum())
+            avg_confidence = float(confidences.mean()) if total_detections > 0 else 0
             
             metadata.update({
                 "ocr_detections": total_detections,
@@ -127,7 +583,7 @@ class ImageProcessor(BaseProcessor):
     def extract_detailed_ocr_results(self, file_path: Path) -> List[Dict[str, Any]]:
         """Extract detailed OCR results with bounding boxes and confidence scores"""
         try:
-            results = self.reader.readtext(str(file_path), detail=1)
+            results = self._run_ocr(file_path)
             
             detailed_results = []
             for bbox, text, confidence in results:
@@ -157,7 +613,7 @@ class ImageProcessor(BaseProcessor):
             min_confidence = self.confidence_threshold
             
         try:
-            results = self.reader.readtext(str(file_path))
+            results = self._run_ocr(file_path)
             text_regions = []
             
             for bbox, text, confidence in results:
@@ -173,23 +629,23 @@ class ImageProcessor(BaseProcessor):
     def estimate_reading_order(self, file_path: Path) -> str:
         """Attempt to order OCR results in reading order (top-to-bottom, left-to-right)"""
         try:
-            results = self.reader.readtext(str(file_path), detail=1)
+            results = self._run_ocr(file_path)
             
             # Filter by confidence and sort by position
             good_results = [(bbox, text, conf) for bbox, text, conf in results 
                            if conf >= self.confidence_threshold]
             
-            # Sort by y-coordinate (top to bottom), then x-coordinate (left to right)
-            def sort_key(item):
-                bbox, text, conf = item
-                y_center = (bbox[0][1] + bbox[2][1]) / 2  # Average y-coordinate
-                x_center = (bbox[0][0] + bbox[2][0]) / 2  # Average x-coordinate
-                return (y_center, x_center)
+            if not good_results:
+                return ""
             
-            sorted_results = sorted(good_results, key=sort_key)
+            # Sort by y-center (top to bottom), then x-center (left to right) in one lexsort
+            bboxes = np.asarray([bbox for bbox, _, _ in good_results], dtype=np.float64)
+            y_center = (bboxes[:, 0, 1] + bboxes[:, 2, 1]) / 2
+            x_center = (bboxes[:, 0, 0] + bboxes[:, 2, 0]) / 2
+            order = np.lexsort((x_center, y_center))
             
             # Extract text in reading order
-            ordered_text = [text for _, text, _ in sorted_results]
+            ordered_text = [good_results[i][1] for i in order]
             return self.clean_text(" ".join(ordered_text))
             
         except Exception as e:
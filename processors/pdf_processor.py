@@ -2,8 +2,10 @@
 PDF document processor using pdfplumber for enhanced text extraction
 """
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+import io
 import logging
+import os
 
 try:
     import pdfplumber
@@ -11,82 +13,172 @@ except ImportError:
     pdfplumber = None
     logging.warning("pdfplumber not installed. Run: pip install pdfplumber")
 
-from .base_processor import BaseProcessor
+# Optional PDFium bindings: much faster plain-text extraction than pdfminer
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None
+
+from .base_processor import BaseProcessor, disk_cached, lower_suffix
+
+# File suffixes handled by this processor
+_PDF_SUFFIXES = frozenset({'.pdf'})
 
 class PDFProcessor(BaseProcessor):
     """Processor for PDF documents with rich text extraction"""
     
+    CACHE_CONFIG_KEYS = ('extract_tables',)
+    
     def __init__(self, config: Dict[str, Any] = None):
         super().__init__(config)
         
         if pdfplumber is None:
             raise ImportError("pdfplumber is required for PDF processing. Install with: pip install pdfplumber")
+        
+        # Tables need pdfplumber's layout analysis; plain text can use PDFium
+        self.include_tables = self.config.get('extract_tables', False)
+        self.text_backend = 'pdfplumber' if self.include_tables or pdfium is None else 'pdfium'
+        
+        # Most recently opened document, shared by all methods: (backend, path, size, mtime_ns) -> doc
+        self._open_docs = {}
     
     def can_process(self, file_path: Path) -> bool:
         """Check if file is a PDF"""
-        return file_path.suffix.lower() == '.pdf'
+        return lower_suffix(os.fspath(file_path)) in _PDF_SUFFIXES
+    
+    def process(self, file_path: Path, stat: Optional[os.stat_result] = None) -> Dict[str, Any]:
+        """Process a PDF, closing the shared document once text and metadata are extracted"""
+        try:
+            return super().process(file_path, stat=stat)
+        finally:
+            self.close()
+    
+    def _open(self, file_path: Path, backend: str = 'pdfplumber'):
+        """Open a PDF with pdfplumber or PDFium, reusing the document across methods"""
+        stat = self._stat(file_path)
+        key = (backend, str(file_path.resolve()), stat.st_size, stat.st_mtime_ns)
+        
+        doc = self._open_docs.get(key)
+        if doc is None:
+            self.close()
+            doc = pdfplumber.open(file_path) if backend == 'pdfplumber' else pdfium.PdfDocument(file_path)
+            self._open_docs[key] = doc
+        return doc
+    
+    def close(self):
+        """Close the cached open document, if any"""
+        for doc in self._open_docs.values():
+            try:
+                doc.close()
+            except Exception as e:
+                self.logger.debug(f"Error closing PDF: {e}")
+        self._open_docs.clear()
     
     def extract_text(self, file_path: Path) -> str:
         """Extract text from PDF with layout preservation"""
         try:
-            text_content = []
+            buf = io.StringIO()
             
-            with pdfplumber.open(file_path) as pdf:
-                self.logger.info(f"Processing PDF with {len(pdf.pages)} pages")
-                
-                for page_num, page in enumerate(pdf.pages, 1):
-                    # Extract text with layout information
-                    page_text = page.extract_text()
+            if self.text_backend == 'pdfplumber':
+                pages = self._iter_page_text(file_path, tables=self.include_tables)
+            else:
+                pages = self._iter_pdfium_text(file_path)
+            
+            for page_num, page_text, tables in pages:
+                if page_text:
+                    # Add page separator
+                    buf.write(f"--- Page {page_num} ---\n")
+                    buf.write(page_text)
+                    buf.write('\n')
                     
-                    if page_text:
-                        # Add page separator
-                        text_content.append(f"--- Page {page_num} ---")
-                        text_content.append(page_text)
-                        
-                        # Try to extract tables if they exist
-                        tables = page.extract_tables()
-                        for i, table in enumerate(tables):
-                            text_content.append(f"--- Table {i+1} on Page {page_num} ---")
-                            # Convert table to text format
-                            for row in table:
-                                if row:
-                                    text_content.append(" | ".join(str(cell) if cell else "" for cell in row))
+                    # Add tables found on the page
+                    for i, table in enumerate(tables):
+                        buf.write(f"--- Table {i+1} on Page {page_num} ---\n")
+                        # Convert table to text format, writing cells straight to the buffer
+                        for row in table:
+                            if row:
+                                for j, cell in enumerate(row):
+                                    if j:
+                                        buf.write(" | ")
+                                    if cell:
+                                        buf.write(str(cell))
+                                buf.write('\n')
             
-            full_text = "\n".join(text_content)
-            return self.clean_text(full_text)
+            return self.clean_text(buf.getvalue())
             
         except Exception as e:
             self.logger.error(f"Error extracting text from PDF {file_path}: {e}")
             return ""
     
+    def _iter_pdfium_text(self, file_path: Path) -> Iterator[Tuple[int, str, List[List[List[str]]]]]:
+        """Yield (page_num, text, []) one page at a time using PDFium (no tables)"""
+        pdf = self._open(file_path, 'pdfium')
+        self.logger.info(f"Processing PDF with {len(pdf)} pages")
+        
+        for page_num in range(1, len(pdf) + 1):
+            page = pdf[page_num - 1]
+            textpage = page.get_textpage()
+            try:
+                yield page_num, textpage.get_text_range().replace('\r\n', '\n'), []
+            finally:
+                textpage.close()
+                page.close()
+    
+    def _iter_page_text(self, file_path: Path, text: bool = True, tables: bool = True) -> Iterator[Tuple[int, str, List[List[List[str]]]]]:
+        """Yield (page_num, text, tables) one page at a time, releasing each page's layout cache
+        
+        With text=False only tables are extracted, for every page. Otherwise tables are
+        extracted only for pages that have text, and only when tables=True.
+        """
+        pdf = self._open(file_path)
+        self.logger.info(f"Processing PDF with {len(pdf.pages)} pages")
+        
+        for page_num, page in enumerate(pdf.pages, 1):
+            try:
+                page_text = page.extract_text() if text else ""
+                page_tables = page.extract_tables() if tables and (page_text or not text) else []
+                yield page_num, page_text, page_tables
+            finally:
+                # pdfplumber keeps chars/objects on every opened page until released
+                if hasattr(page, 'close'):
+                    page.close()
+                else:
+                    page.flush_cache()
+    
     def extract_metadata(self, file_path: Path) -> Dict[str, Any]:
         """Extract metadata from PDF"""
         metadata = self.get_file_info(file_path)
         
         try:
-            with pdfplumber.open(file_path) as pdf:
-                # PDF-specific metadata
+            # Read from the document extract_text already opened
+            pdf = self._open(file_path, self.text_backend)
+            if self.text_backend == 'pdfium':
+                pdf_metadata = pdf.get_metadata_dict()
+                page_count = len(pdf)
+            else:
                 pdf_metadata = pdf.metadata or {}
-                
-                metadata.update({
-                    "pages": len(pdf.pages),
-                    "title": pdf_metadata.get('Title', ''),
-                    "author": pdf_metadata.get('Author', ''),
-                    "subject": pdf_metadata.get('Subject', ''),
-                    "creator": pdf_metadata.get('Creator', ''),
-                    "producer": pdf_metadata.get('Producer', ''),
-                    "creation_date": str(pdf_metadata.get('CreationDate', '')),
-                    "modification_date": str(pdf_metadata.get('ModDate', '')),
-                })
-                
-                # Skip table extraction for faster processing
-                # (Table extraction can be slow on complex PDFs)
-                total_tables = 0
-                # for page in pdf.pages:
-                #     tables = page.extract_tables()
-                #     total_tables += len(tables)
-                
-                metadata["total_tables"] = total_tables
+                page_count = len(pdf.pages)
+            
+            # PDF-specific metadata
+            metadata.update({
+                "pages": page_count,
+                "title": pdf_metadata.get('Title', ''),
+                "author": pdf_metadata.get('Author', ''),
+                "subject": pdf_metadata.get('Subject', ''),
+                "creator": pdf_metadata.get('Creator', ''),
+                "producer": pdf_metadata.get('Producer', ''),
+                "creation_date": str(pdf_metadata.get('CreationDate', '')),
+                "modification_date": str(pdf_metadata.get('ModDate', '')),
+            })
+            
+            # Skip table extraction for faster processing
+            # (Table extraction can be slow on complex PDFs)
+            total_tables = 0
+            # for page in pdf.pages:
+            #     tables = page.extract_tables()
+            #     total_tables += len(tables)
+            
+            metadata["total_tables"] = total_tables
                 
         except Exception as e:
             self.logger.error(f"Error extracting PDF metadata from {file_path}: {e}")
@@ -94,15 +186,14 @@ class PDFProcessor(BaseProcessor):
         
         return metadata
     
+    @disk_cached
     def extract_tables(self, file_path: Path) -> List[List[List[str]]]:
         """Extract tables from PDF as structured data"""
         tables = []
         
         try:
-            with pdfplumber.open(file_path) as pdf:
-                for page in pdf.pages:
-                    page_tables = page.extract_tables()
-                    tables.extend(page_tables)
+            for _, _, page_tables in self._iter_page_text(file_path, text=False):
+                tables.extend(page_tables)
         except Exception as e:
             self.logger.error(f"Error extracting tables from PDF {file_path}: {e}")
         
@@ -111,13 +202,13 @@ class PDFProcessor(BaseProcessor):
     def get_page_text(self, file_path: Path, page_number: int) -> str:
         """Extract text from a specific page"""
         try:
-            with pdfplumber.open(file_path) as pdf:
-                if 0 <= page_number < len(pdf.pages):
-                    page = pdf.pages[page_number]
-                    return self.clean_text(page.extract_text() or "")
-                else:
-                    self.logger.warning(f"Page {page_number} does not exist in {file_path}")
-                    return ""
+            pdf = self._open(file_path)
+            if 0 <= page_number < len(pdf.pages):
+                page = pdf.pages[page_number]
+                return self.clean_text(page.extract_text() or "")
+            else:
+                self.logger.warning(f"Page {page_number} does not exist in {file_path}")
+                return ""
         except Exception as e:
             self.logger.error(f"Error extracting page {page_number} from PDF {file_path}: {e}")
             return ""
\ No newline at end of file
@@ -1,9 +1,70 @@
 """
 Configuration management for Document RAG Extractor
 """
+import hashlib
+import marshal
+import os
+import string
 import yaml
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, Optional
+
+# Prefer the libyaml-backed loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeLoader as _Loader
+
+# Parsed YAML files, stored with marshal (which cannot run code, unlike pickle)
+# in a directory only the current user can write, for fast warm starts
+CACHE_DIR = Path(os.environ.get('XDG_CACHE_HOME', Path.home() / '.cache')) / 'docmineai'
+
+def _cache_dir_is_private() -> bool:
+    """Create CACHE_DIR as 0700 and check nobody else can write to it"""
+    try:
+        CACHE_DIR.mkdir(mode=0o700, parents=True, exist_ok=True)
+        stat = CACHE_DIR.stat()
+    except OSError:
+        return False
+    
+    if hasattr(os, 'getuid') and stat.st_uid != os.getuid():
+        return False
+    return not stat.st_mode & 0o022
+
+def load_yaml(path: Path) -> Any:
+    """Parse a YAML file, reusing a cached copy while the file is unchanged"""
+    # One cache file per path, overwritten when the file changes, so edits leave nothing stale
+    resolved = str(path.resolve())
+    stat = path.stat()
+    version = (stat.st_size, stat.st_mtime_ns)
+    cache_path = CACHE_DIR / f"{path.stem}.{hashlib.sha1(resolved.encode('utf-8')).hexdigest()}.marshal"
+    use_cache = _cache_dir_is_private()
+    
+    if use_cache:
+        try:
+            with open(cache_path, 'rb') as f:
+                cached_version, data = marshal.load(f)
+            if cached_version == version:
+                return data
+        except Exception:
+            pass
+    
+    with open(path, 'r', encoding='utf-8') as f:
+        data = yaml.load(f, Loader=_Loader)
+    
+    if use_cache:
+        try:
+            # Raises ValueError for values marshal can't store (e.g. YAML timestamps)
+            payload = marshal.dumps((version, data))
+            tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_path, cache_path)
+        except Exception:
+            # Caching is best effort (e.g. read-only home directory)
+            pass
+    
+    return data
 
 class ConfigManager:
     """Manages configuration loading and validation"""
@@ -17,8 +78,7 @@ class ConfigManager:
         if not self.config_path.exists():
             raise FileNotFoundError(f"Configuration file not found: {self.config_path}")
         
-        with open(self.config_path, 'r', encoding='utf-8') as f:
-            config = yaml.safe_load(f)
+        config = load_yaml(self.config_path)
         
         # Validate required sections
         self._validate_config(config)
@@ -53,41 +113,78 @@ class ConfigManager:
         """Get general configuration"""
         return self.config['general']
 
+def compile_prompt(template: str, persona: str) -> Callable[[str], str]:
+    """Pre-parse a prompt template with the persona filled in, returning text_chunk -> prompt
+    
+    Templates using anything beyond plain {persona}/{text_chunk} fields fall back to
+    str.format, so errors surface exactly as before.
+    """
+    def format_fallback(text_chunk: str) -> str:
+        return template.format(persona=persona, text_chunk=text_chunk)
+    
+    pieces = []
+    try:
+        for literal, field, spec, conversion in string.Formatter().parse(template):
+            pieces.append(literal)
+            if field is None:
+                continue
+            if spec or conversion or field not in ('persona', 'text_chunk'):
+                return format_fallback
+            pieces.append(format(persona) if field == 'persona' else None)
+    except ValueError:
+        return format_fallback
+    
+    # Merge literals into the segments between text_chunk fields
+    segments = ['']
+    for piece in pieces:
+        if piece is None:
+            segments.append('')
+        else:
+            segments[-1] += piece
+    
+    if len(segments) == 1:
+        return lambda text_chunk: segments[0]
+    if len(segments) == 2:
+        prefix, suffix = segments
+        return lambda text_chunk: prefix + text_chunk + suffix
+    return lambda text_chunk: text_chunk.join(segments)
+
 class PromptsManager:
     """Manages extraction prompts"""
     
     def __init__(self, prompts_path: Optional[Path] = None):
         self.prompts_path = prompts_path or Path("prompts/custom_prompts.yaml")
         self.prompts = self.load_prompts()
+        self._index_prompts()
     
     def load_prompts(self) -> Dict[str, Any]:
         """Load prompts from YAML file"""
         if not self.prompts_path.exists():
             raise FileNotFoundError(f"Prompts file not found: {self.prompts_path}")
         
-        with open(self.prompts_path, 'r', encoding='utf-8') as f:
-            return yaml.safe_load(f)
+        return load_yaml(self.prompts_path)
+    
+    def _index_prompts(self):
+        """Flatten persona and templates once, so per-chunk lookups are a single dict get"""
+        prompts = self.prompts.get('prompts', {})
+        
+        self._persona = self.prompts.get('persona', '')
+        self._templates = {name: spec.get('prompt_template', '') for name, spec in prompts.items()}
+        # Fallback for unknown extraction types
+        self._default_template = prompts.get('custom', {}).get('prompt_template', '')
+        
+        # Templates pre-parsed with the persona substituted
+        self._compiled = {name: compile_prompt(template, self._persona) for name, template in self._templates.items()}
+        self._compiled_default = compile_prompt(self._default_template, self._persona)
     
     def get_persona(self) -> str:
         """Get the AI persona for extractions"""
-        return self.prompts.get('persona', '')
+        return self._persona
     
     def get_prompt_template(self, extraction_type: str) -> str:
         """Get prompt template for specific extraction type"""
-        prompts = self.prompts.get('prompts', {})
-        
-        if extraction_type not in prompts:
-            # Fallback to custom prompt
-            return prompts.get('custom', {}).get('prompt_template', '')
-        
-        return prompts[extraction_type].get('prompt_template', '')
+        return self._templates.get(extraction_type, self._default_template)
     
     def format_prompt(self, extraction_type: str, text_chunk: str) -> str:
         """Format a prompt with persona and text chunk"""
-        template = self.get_prompt_template(extraction_type)
-        persona = self.get_persona()
-        
-        return template.format(
-            persona=persona,
-            text_chunk=text_chunk
-        )
\ No newline at end of file
+        return self._compiled.get(extraction_type, self._compiled_default)(text_chunk)
@@ -0,0 +1,359 @@
+"""
+LLM response caching for Document RAG Extractor
+Repeated prompts (re-runs, identical chunks) are answered from memory or disk
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, List, Optional, Tuple
+
+from llm_interface import LLMInterface
+
+# diskcache is optional; a small sqlite3 store is used without it
+try:
+    import diskcache
+except ImportError:
+    diskcache = None
+
+# Optional semantic (near-duplicate) cache
+try:
+    import faiss
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    faiss = None
+    SentenceTransformer = None
+
+logger = logging.getLogger(__name__)
+
+# (namespace, text) identifying a prompt's variable part for the semantic tier
+SemanticKey = Tuple[str, str]
+
+# Above this temperature responses vary too much to be worth reusing
+MAX_CACHEABLE_TEMPERATURE = 0.2
+
+class _SQLiteStore:
+    """Minimal key/value store with expiry, used when diskcache is not installed"""
+    
+    def __init__(self, directory: Path):
+        directory.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(directory / "responses.sqlite3"), timeout=30, check_same_thread=False)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT, expires REAL)")
+        self.conn.commit()
+    
+    def get(self, key: str) -> Optional[str]:
+        row = self.conn.execute("SELECT value, expires FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None or (row[1] is not None and row[1] < time.time()):
+            return None
+        return row[0]
+    
+    def set(self, key: str, value: str, expire: Optional[float] = None):
+        expires = time.time() + expire if expire else None
+        self.conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?)", (key, value, expires))
+        self.conn.commit()
+    
+    def close(self):
+        self.conn.close()
+
+class SemanticLLMCache:
+    """Nearest-neighbour cache of responses by input embedding (cosine similarity)
+    
+    Inputs are compared only within their namespace (e.g. model settings plus
+    prompt template), each with its own index, so text shared by every prompt
+    of a template never makes different inputs look alike.
+    """
+    
+    def __init__(self, cache_dir: str = ".llm_cache", threshold: float = 0.92,
+                 model_name: str = "all-MiniLM-L6-v2"):
+        if faiss is None or SentenceTransformer is None:
+            raise ImportError("faiss and sentence-transformers are required for the semantic LLM cache. "
+                              "Install with: pip install faiss-cpu sentence-transformers")
+        
+        self.threshold = threshold
+        self.model = SentenceTransformer(model_name)
+        self.cache_dir = Path(cache_dir)
+        self.model_tag = model_name.replace('/', '_')
+        
+        # namespace -> (faiss index, responses), loaded on first use
+        self._indexes = {}
+        self._dirty = set()
+    
+    def _paths(self, namespace: str):
+        """Index and responses files for a namespace"""
+        digest = hashlib.sha256(namespace.encode('utf-8')).hexdigest()[:16]
+        index_path = self.cache_dir / f"semantic-{self.model_tag}-{digest}.index"
+        return index_path, index_path.with_suffix('.json')
+    
+    def _index(self, namespace: str):
+        """(index, responses) for a namespace, loading or creating it"""
+        entry = self._indexes.get(namespace)
+        if entry is None:
+            index_path, responses_path = self._paths(namespace)
+            
+            # Inner product over normalized embeddings is cosine similarity
+            if index_path.exists() and responses_path.exists():
+                entry = (faiss.read_index(str(index_path)), json.loads(responses_path.read_text(encoding='utf-8')))
+            else:
+                entry = (faiss.IndexFlatIP(self.model.get_sentence_embedding_dimension()), [])
+            self._indexes[namespace] = entry
+        return entry
+    
+    def embed(self, texts: List[str]):
+        """Normalized embeddings of texts, shaped (n, dim) for faiss"""
+        return self.model.encode(texts, normalize_embeddings=True).astype('float32')
+    
+    def lookup(self, namespace: str, embedding) -> Optional[str]:
+        """Response of the most similar cached input in the namespace, if similar enough (embedding is (1, dim))"""
+        index, responses = self._index(namespace)
+        if index.ntotal == 0:
+            return None
+        
+        scores, ids = index.search(embedding, 1)
+        if scores[0, 0] >= self.threshold:
+            return responses[ids[0, 0]]
+        return None
+    
+    def add(self, namespace: str, embedding, response: str):
+        """Remember a response for an embedded input"""
+        index, responses = self._index(namespace)
+        index.add(embedding)
+        responses.append(response)
+        self._dirty.add(namespace)
+    
+    def save(self):
+        """Persist the indexes and responses of namespaces that had additions"""
+        if not self._dirty:
+            return
+        
+        # Write then rename, so concurrent runs never load a partial file
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        suffix = f".{os.getpid()}.tmp"
+        
+        for namespace in self._dirty:
+            index, responses = self._indexes[namespace]
+            index_path, responses_path = self._paths(namespace)
+            
+            responses_tmp = responses_path.with_name(responses_path.name + suffix)
+            responses_tmp.write_text(json.dumps(responses, ensure_ascii=False), encoding='utf-8')
+            os.replace(responses_tmp, responses_path)
+            
+            index_tmp = index_path.with_name(index_path.name + suffix)
+            faiss.write_index(index, str(index_tmp))
+            os.replace(index_tmp, index_path)
+        self._dirty.clear()
+
+class CachedLLM(LLMInterface):
+    """Wraps an LLM interface with an in-memory LRU and on-disk response cache"""
+    
+    def __init__(self, llm: LLMInterface, cache_dir: str = ".llm_cache", ttl: Optional[float] = None,
+                 memory_size: int = 1024, semantic_threshold: Optional[float] = None):
+        self.llm = llm
+        self.ttl = ttl
+        self.memory_size = memory_size
+        self._memory = OrderedDict()
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self._closed = False
+        
+        # Everything that changes the response for a given prompt
+        self._key_prefix = {
+            "backend": llm.__class__.__name__,
+            "model": getattr(llm, 'model_name', None),
+            "t": getattr(llm, 'temperature', None),
+            "max_tokens": getattr(llm, 'max_tokens', None),
+        }
+        
+        temperature = self._key_prefix["t"]
+        self.enabled = temperature is not None and temperature <= MAX_CACHEABLE_TEMPERATURE
+        if not self.enabled:
+            logger.info(f"LLM response cache disabled: temperature {temperature} is above {MAX_CACHEABLE_TEMPERATURE}")
+            self._store = None
+        elif diskcache is not None:
+            self._store = diskcache.Cache(cache_dir)
+        else:
+            self._store = _SQLiteStore(Path(cache_dir))
+        
+        # Near-duplicate prompts, checked after an exact-match miss
+        self.semantic = None
+        if self.enabled and semantic_threshold is not None:
+            try:
+                self.semantic = SemanticLLMCache(cache_dir, threshold=semantic_threshold)
+            except ImportError as e:
+                logger.warning(f"Semantic LLM cache disabled: {e}")
+    
+    def _check_open(self):
+        """close() is terminal: the disk store can't be used once it has been closed"""
+        if self._closed:
+            raise RuntimeError("CachedLLM is closed; create a new one to generate again")
+    
+    def _key(self, prompt: str) -> str:
+        """SHA-256 of the model settings and prompt"""
+        payload = json.dumps({**self._key_prefix, "prompt": prompt}, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def _lookup(self, key: str) -> Optional[str]:
+        """Cached response from memory, then disk"""
+        value = self._memory.get(key)
+        if value is not None:
+            self._memory.move_to_end(key)
+        else:
+            value = self._store.get(key)
+            if value is not None:
+                self._remember(key, value)
+        
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+    
+    def _remember(self, key: str, value: str):
+        """Keep a response in the in-memory LRU"""
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+    
+    def _semantic_namespace(self, namespace: str) -> str:
+        """Semantic index namespace: the caller's (e.g. prompt template) plus model settings"""
+        return json.dumps({**self._key_prefix, "namespace": namespace}, sort_keys=True)
+    
+    def _semantic_lookup(self, key: str, namespace: str, embedding) -> Optional[str]:
+        """Response cached for a near-duplicate input, counted as a semantic hit"""
+        value = self.semantic.lookup(namespace, embedding)
+        if value is not None:
+            # The exact lookup already counted this as a miss
+            self.misses -= 1
+            self.semantic_hits += 1
+            self._remember(key, value)
+        return value
+    
+    def _store_response(self, key: str, value: str, semantic_entry: Optional[Tuple[str, Any]] = None):
+        """Write a fresh response to memory and disk, and to the semantic index if embedded"""
+        self._remember(key, value)
+        if semantic_entry is not None:
+            self.semantic.add(*semantic_entry, value)
+        try:
+            self._store.set(key, value, expire=self.ttl)
+        except Exception as e:
+            logger.warning(f"Failed to write LLM cache entry: {e}")
+    
+    def generate(self, prompt: str, semantic_key: Optional[SemanticKey] = None) -> str:
+        """Generate response, reusing a cached one for identical prompts
+        
+        semantic_key is (namespace, text): near-duplicate texts in the same
+        namespace share responses when the semantic tier is enabled.
+        """
+        self._check_open()
+        if not self.enabled:
+            return self.llm.generate(prompt)
+        
+        key = self._key(prompt)
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+        
+        semantic_entry = None
+        if self.semantic is not None and semantic_key is not None:
+            namespace = self._semantic_namespace(semantic_key[0])
+            semantic_entry = (namespace, self.semantic.embed([semantic_key[1]]))
+            cached = self._semantic_lookup(key, *semantic_entry)
+            if cached is not None:
+                return cached
+        
+        response = self.llm.generate(prompt)
+        self._store_response(key, response, semantic_entry)
+        return response
+    
+    async def agenerate(self, prompt: str, semantic_key: Optional[SemanticKey] = None) -> str:
+        """Generate response asynchronously, reusing a cached one for identical prompts"""
+        self._check_open()
+        if not self.enabled:
+            return await self.llm.agenerate(prompt)
+        
+        key = self._key(prompt)
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+        
+        semantic_entry = None
+        if self.semantic is not None and semantic_key is not None:
+            # Embedding is CPU-bound; keep it off the event loop
+            namespace = self._semantic_namespace(semantic_key[0])
+            embedding = await asyncio.get_running_loop().run_in_executor(None, self.semantic.embed, [semantic_key[1]])
+            semantic_entry = (namespace, embedding)
+            cached = self._semantic_lookup(key, *semantic_entry)
+            if cached is not None:
+                return cached
+        
+        response = await self.llm.agenerate(prompt)
+        self._store_response(key, response, semantic_entry)
+        return response
+    
+    async def agenerate_batch(self, prompts: List[str], max_concurrency: int = 8,
+                              return_exceptions: bool = True,
+                              semantic_keys: Optional[List[SemanticKey]] = None) -> List[Any]:
+        """Answer cached prompts directly and send the rest to the wrapped interface as one batch
+        
+        semantic_keys, one (namespace, text) per prompt, enable near-duplicate
+        lookups; without them only identical prompts are reused.
+        """
+        self._check_open()
+        if not self.enabled:
+            return await self.llm.agenerate_batch(prompts, max_concurrency, return_exceptions)
+        
+        results = [None] * len(prompts)
+        keys = [self._key(prompt) for prompt in prompts]
+        missed = []
+        for i, key in enumerate(keys):
+            results[i] = self._lookup(key)
+            if results[i] is None:
+                missed.append(i)
+        
+        # Embed all exact misses in one call (CPU-bound, so off the event loop)
+        semantic_entries = {}
+        if self.semantic is not None and semantic_keys is not None and missed:
+            vectors = await asyncio.get_running_loop().run_in_executor(
+                None, self.semantic.embed, [semantic_keys[i][1] for i in missed])
+            pending = []
+            for row, i in enumerate(missed):
+                semantic_entries[i] = (self._semantic_namespace(semantic_keys[i][0]), vectors[row:row + 1])
+                results[i] = self._semantic_lookup(keys[i], *semantic_entries[i])
+                if results[i] is None:
+                    pending.append(i)
+            missed = pending
+        
+        if missed:
+            responses = await self.llm.agenerate_batch([prompts[i] for i in missed], max_concurrency, return_exceptions)
+            for i, response in zip(missed, responses):
+                results[i] = response
+                if not isinstance(response, Exception):
+                    self._store_response(keys[i], response, semantic_entries.get(i))
+        
+        if self.semantic is not None:
+            self.semantic.save()
+        logger.info(f"LLM cache: {self.hits} hits, {self.semantic_hits} semantic hits, {self.misses} misses")
+        return results
+    
+    async def aclose(self):
+        await self.llm.aclose()
+    
+    def is_available(self) -> bool:
+        return self.llm.is_available()
+    
+    def close(self):
+        """Close the wrapped interface and the disk store (further calls raise RuntimeError)"""
+        if self._closed:
+            return
+        self._closed = True
+        self.llm.close()
+        if self.semantic is not None:
+            self.semantic.save()
+        if self._store is not None:
+            self._store.close()
@@ -4,21 +4,53 @@ Supports both local Ollama and OpenAI API models
 """
 import os
 import json
+import asyncio
+import tempfile
+import time
+import importlib
+import itertools
+import importlib.util
 import requests
-from typing import Dict, Any, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, Any, List, Optional, Union
 import logging
 from abc import ABC, abstractmethod
 
-# Try to import OpenAI - make it optional
+# Optional async HTTP client for concurrent Ollama requests
 try:
-    import openai
-    OPENAI_AVAILABLE = True
+    import httpx
+    HTTP2_AVAILABLE = importlib.util.find_spec('h2') is not None
 except ImportError:
-    OPENAI_AVAILABLE = False
-    openai = None
+    httpx = None
+    HTTP2_AVAILABLE = False
+
+# OpenAI is optional and imported on first use: it pulls in httpx/pydantic,
+# which slows CLI startup for Ollama-only runs
+OPENAI_AVAILABLE = importlib.util.find_spec('openai') is not None
+openai = None
+
+def _import_openai():
+    """Import the OpenAI package the first time an OpenAI interface is created"""
+    global openai
+    if openai is None:
+        openai = importlib.import_module('openai')
+    return openai
 
 logger = logging.getLogger(__name__)
 
+# Responses worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+def _retry_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    """Seconds to wait before retry `attempt` (0-based), honouring a Retry-After header"""
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass
+    return 0.5 * 2 ** attempt
+
 class LLMInterface(ABC):
     """Abstract base class for LLM interfaces"""
     
@@ -27,35 +59,121 @@ class LLMInterface(ABC):
         """Generate response from the model"""
         pass
     
+    async def agenerate(self, prompt: str) -> str:
+        """Generate response without blocking the event loop"""
+        # Default: run the blocking client on the loop's thread pool
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.generate, prompt)
+    
+    async def agenerate_batch(self, prompts: List[str], max_concurrency: int = 8,
+                              return_exceptions: bool = True) -> List[Any]:
+        """Generate responses for many prompts concurrently, at most max_concurrency in flight"""
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def generate_one(prompt):
+            async with semaphore:
+                logger.debug(f"Sending prompt ({len(prompt)} chars)")
+                return await self.agenerate(prompt)
+        
+        # Identical prompts are sent once and share the response
+        unique = list(dict.fromkeys(prompts))
+        if len(unique) < len(prompts):
+            logger.debug(f"Sending {len(unique)} unique prompts of {len(prompts)}")
+        
+        try:
+            # By default failed requests come back as exceptions so one bad prompt doesn't sink the batch
+            responses = await asyncio.gather(*(generate_one(prompt) for prompt in unique), return_exceptions=return_exceptions)
+        finally:
+            # Async clients can't outlive the loop (e.g. one asyncio.run per batch)
+            await self.aclose()
+        
+        if len(unique) == len(prompts):
+            return responses
+        by_prompt = dict(zip(unique, responses))
+        return [by_prompt[prompt] for prompt in prompts]
+    
+    async def aclose(self):
+        """Close async clients created on the running event loop"""
+        pass
+    
     @abstractmethod
     def is_available(self) -> bool:
         """Check if the model is available"""
         pass
+    
+    def close(self):
+        """Release pooled connections"""
+        pass
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
 class OllamaInterface(LLMInterface):
     """Interface for local Ollama models"""
     
-    def __init__(self, model_name: str = "llama3.2", base_url: str = "http://localhost:11434", timeout: int = 120):
+    def __init__(self, model_name: str = "llama3.2", base_url: Union[str, List[str]] = "http://localhost:11434",
+                 timeout: int = 120, keep_alive: str = "30m", max_retries: int = 3):
         self.model_name = model_name
-        self.base_url = base_url.rstrip('/')
+        
+        # One or more Ollama servers serving the same model; requests are spread across them
+        base_urls = [base_url] if isinstance(base_url, str) else list(base_url)
+        if not base_urls:
+            raise ValueError("At least one Ollama base_url is required")
+        self.base_urls = [url.rstrip('/') for url in base_urls]
+        self.base_url = self.base_urls[0]
+        self._next_base_url = itertools.cycle(self.base_urls)
+        self._inflight = dict.fromkeys(self.base_urls, 0)
         self.timeout = timeout
+        self.keep_alive = keep_alive
+        self.temperature = 0.1
+        self.max_retries = max_retries
+        
+        # Reuse keep-alive connections across chunk requests. 429/5xx responses (e.g.
+        # model still loading) and connection errors are retried with backoff; read
+        # timeouts are not, so a slow generation is never sent twice.
+        self.session = requests.Session()
+        retry = Retry(
+            total=max_retries,
+            connect=min(2, max_retries),
+            read=0,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=frozenset({'GET', 'POST'}),
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=max(16, len(self.base_urls)), pool_maxsize=64, max_retries=retry)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
+        # Async client, created per event loop (httpx connections are bound to their loop)
+        self._aclient = None
+        self._aclient_loop = None
+    
+    def _payload(self, prompt: str) -> Dict[str, Any]:
+        """Request body for /api/generate"""
+        return {
+            "model": self.model_name,
+            "prompt": prompt,
+            "stream": False,
+            "keep_alive": self.keep_alive,  # Keep the model loaded between requests
+            "options": {
+                "temperature": self.temperature,
+                "top_p": 0.9
+            }
+        }
         
     def generate(self, prompt: str) -> str:
         """Generate response using Ollama API"""
         try:
-            url = f"{self.base_url}/api/generate"
-            payload = {
-                "model": self.model_name,
-                "prompt": prompt,
-                "stream": False,
-                "options": {
-                    "temperature": 0.1,
-                    "top_p": 0.9
-                }
-            }
+            # Round-robin across servers (next() on a cycle is safe from executor threads)
+            url = f"{next(self._next_base_url)}/api/generate"
+            payload = self._payload(prompt)
             
             logger.debug(f"Sending request to Ollama: {url}")
-            response = requests.post(url, json=payload, timeout=self.timeout)
+            response = self.session.post(url, json=payload, timeout=self.timeout)
             response.raise_for_status()
             
             result = response.json()
@@ -68,40 +186,127 @@ class OllamaInterface(LLMInterface):
             logger.error(f"Failed to parse Ollama response: {e}")
             raise Exception(f"Invalid JSON response from Ollama: {e}")
     
-    def is_available(self) -> bool:
-        """Check if Ollama is available"""
+    def _async_client(self):
+        """httpx client for the running event loop, shared by all its requests"""
+        loop = asyncio.get_running_loop()
+        if self._aclient is None or self._aclient_loop is not loop:
+            self._aclient = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=64 * len(self.base_urls),
+                                    max_keepalive_connections=32 * len(self.base_urls)),
+                http2=HTTP2_AVAILABLE
+            )
+            self._aclient_loop = loop
+        return self._aclient
+    
+    async def agenerate(self, prompt: str) -> str:
+        """Generate response using Ollama API without blocking the event loop"""
+        if httpx is None:
+            return await super().agenerate(prompt)
+        
         try:
-            url = f"{self.base_url}/api/tags"
-            response = requests.get(url, timeout=5)
-            return response.status_code == 200
-        except requests.exceptions.RequestException:
-            return False
+            # Same policy as the sync session: retry 429/5xx and failed connects with
+            # backoff, never a request that may already be generating
+            client = self._async_client()
+            
+            # Send to the server with the fewest requests in flight
+            base_url = min(self.base_urls, key=self._inflight.__getitem__)
+            self._inflight[base_url] += 1
+            try:
+                for attempt in range(self.max_retries + 1):
+                    try:
+                        response = await client.post(f"{base_url}/api/generate", json=self._payload(prompt))
+                    except (httpx.ConnectError, httpx.ConnectTimeout):
+                        if attempt == self.max_retries:
+                            raise
+                        await asyncio.sleep(_retry_delay(attempt))
+                        continue
+                    
+                    if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                        await asyncio.sleep(_retry_delay(attempt, response.headers.get('Retry-After')))
+                        continue
+                    
+                    response.raise_for_status()
+                    result = response.json()
+                    return result.get('response', '')
+            finally:
+                self._inflight[base_url] -= 1
+            
+        except httpx.HTTPError as e:
+            logger.error(f"Ollama API error: {e}")
+            raise Exception(f"Failed to get response from Ollama: {e}")
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse Ollama response: {e}")
+            raise Exception(f"Invalid JSON response from Ollama: {e}")
+    
+    async def aclose(self):
+        """Close the httpx client created on the running event loop"""
+        if self._aclient is not None and self._aclient_loop is asyncio.get_running_loop():
+            await self._aclient.aclose()
+        self._aclient = None
+    
+    def close(self):
+        """Close the pooled HTTP session"""
+        self.session.close()
+    
+    def is_available(self) -> bool:
+        """Check if Ollama is available (on any configured server)"""
+        for base_url in self.base_urls:
+            try:
+                response = self.session.get(f"{base_url}/api/tags", timeout=5)
+                if response.status_code == 200:
+                    return True
+            except requests.exceptions.RequestException:
+                continue
+        return False
 
 class OpenAIInterface(LLMInterface):
     """Interface for OpenAI API models"""
     
+    # Seconds an is_available() result is reused for
+    AVAILABILITY_TTL = 60
+    
     def __init__(self, model_name: str = "gpt-3.5-turbo", api_key: Optional[str] = None, 
-                 max_tokens: int = 2000, temperature: float = 0.1):
+                 max_tokens: int = 2000, temperature: float = 0.1, use_batch_api: bool = False,
+                 batch_api_min_prompts: int = 50, batch_poll_interval: int = 30, max_retries: int = 3):
         
         if not OPENAI_AVAILABLE:
             raise ImportError("OpenAI package not installed. Install with: pip install openai")
+        _import_openai()
         
         self.model_name = model_name
         self.max_tokens = max_tokens
         self.temperature = temperature
         
+        # The OpenAI client retries rate limits, 5xx and connection errors itself,
+        # with exponential backoff that honours Retry-After
+        self.max_retries = max_retries
+        
+        # Offline runs: send large prompt sets through the (cheaper, slower) Batch API
+        self.use_batch_api = use_batch_api
+        self.batch_api_min_prompts = batch_api_min_prompts
+        self.batch_poll_interval = batch_poll_interval
+        
         # Set API key
         api_key = api_key or os.getenv('OPENAI_API_KEY')
         if not api_key:
             raise ValueError("OpenAI API key not provided. Set OPENAI_API_KEY environment variable.")
         
         # Initialize client for newer OpenAI library versions
+        self.api_key = api_key
         try:
-            self.client = openai.OpenAI(api_key=api_key)
+            self.client = openai.OpenAI(api_key=api_key, max_retries=max_retries)
         except AttributeError:
             # Fallback for older versions
             openai.api_key = api_key
             self.client = None
+        
+        # Async client, created per event loop like OllamaInterface's
+        self._aclient = None
+        self._aclient_loop = None
+        
+        self._available = None
+        self._available_checked = 0.0
     
     def generate(self, prompt: str) -> str:
         """Generate response using OpenAI API"""
@@ -132,28 +337,133 @@ class OpenAIInterface(LLMInterface):
             logger.error(f"OpenAI API error: {e}")
             raise Exception(f"Failed to get response from OpenAI: {e}")
     
+    async def agenerate(self, prompt: str) -> str:
+        """Generate response using the async OpenAI client"""
+        if not self.client or not hasattr(openai, 'AsyncOpenAI'):
+            return await super().agenerate(prompt)
+        
+        loop = asyncio.get_running_loop()
+        if self._aclient is None or self._aclient_loop is not loop:
+            self._aclient = openai.AsyncOpenAI(api_key=self.api_key, max_retries=self.max_retries)
+            self._aclient_loop = loop
+        
+        try:
+            response = await self._aclient.chat.completions.create(
+                model=self.model_name,
+                messages=[
+                    {"role": "user", "content": prompt}
+                ],
+                max_tokens=self.max_tokens,
+                temperature=self.temperature
+            )
+            return response.choices[0].message.content.strip()
+            
+        except Exception as e:
+            logger.error(f"OpenAI API error: {e}")
+            raise Exception(f"Failed to get response from OpenAI: {e}")
+    
+    def generate_batch(self, prompts: List[str]) -> List[Any]:
+        """Run prompts through the OpenAI Batch API, returning responses (or exceptions) in order
+        
+        Blocks until the batch finishes, which can take up to the 24h completion window.
+        """
+        if not self.client:
+            raise Exception("The Batch API requires openai>=1.0")
+        
+        with tempfile.NamedTemporaryFile('w', suffix='.jsonl', encoding='utf-8', delete=False) as f:
+            for i, prompt in enumerate(prompts):
+                f.write(json.dumps({
+                    "custom_id": f"req-{i}",
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": {
+                        "model": self.model_name,
+                        "messages": [{"role": "user", "content": prompt}],
+                        "max_tokens": self.max_tokens,
+                        "temperature": self.temperature
+                    }
+                }) + "\n")
+            input_path = f.name
+        
+        try:
+            with open(input_path, 'rb') as f:
+                input_file = self.client.files.create(file=f, purpose="batch")
+        finally:
+            os.unlink(input_path)
+        
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        logger.info(f"Submitted OpenAI batch {batch.id} with {len(prompts)} prompts")
+        
+        while batch.status not in ('completed', 'failed', 'expired', 'cancelled'):
+            time.sleep(self.batch_poll_interval)
+            batch = self.client.batches.retrieve(batch.id)
+            logger.debug(f"OpenAI batch {batch.id}: {batch.status}")
+        
+        # Requests missing from the output (failed, expired) stay as exceptions
+        results = [Exception(f"OpenAI batch {batch.id} {batch.status} without a response") for _ in prompts]
+        if batch.output_file_id:
+            for line in self.client.files.content(batch.output_file_id).text.splitlines():
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                index = int(record["custom_id"].split("-", 1)[1])
+                response = record.get("response") or {}
+                if response.get("status_code") == 200:
+                    results[index] = response["body"]["choices"][0]["message"]["content"].strip()
+                else:
+                    results[index] = Exception(f"OpenAI batch request failed: {record.get('error') or response}")
+        
+        logger.info(f"OpenAI batch {batch.id} {batch.status}")
+        return results
+    
+    async def agenerate_batch(self, prompts: List[str], max_concurrency: int = 8,
+                              return_exceptions: bool = True) -> List[Any]:
+        """Generate responses concurrently, or via the Batch API for large offline runs"""
+        unique = list(dict.fromkeys(prompts))
+        if not (self.use_batch_api and self.client and len(unique) >= self.batch_api_min_prompts):
+            return await super().agenerate_batch(prompts, max_concurrency, return_exceptions)
+        
+        # Identical prompts are submitted once, as in the concurrent path
+        results = await asyncio.get_running_loop().run_in_executor(None, self.generate_batch, unique)
+        if not return_exceptions:
+            for result in results:
+                if isinstance(result, Exception):
+                    raise result
+        by_prompt = dict(zip(unique, results))
+        return [by_prompt[prompt] for prompt in prompts]
+    
+    async def aclose(self):
+        """Close the async OpenAI client created on the running event loop"""
+        if self._aclient is not None and self._aclient_loop is asyncio.get_running_loop():
+            await self._aclient.close()
+        self._aclient = None
+    
     def is_available(self) -> bool:
         """Check if OpenAI API is available"""
         if not OPENAI_AVAILABLE:
             return False
             
+        # Reuse a recent answer rather than asking the API at every pipeline stage
+        now = time.monotonic()
+        if self._available is not None and now - self._available_checked < self.AVAILABILITY_TTL:
+            return self._available
+        
         try:
-            # Simple test with minimal tokens
+            # Looking up the model checks the key and model access without spending tokens
             if self.client:
-                response = self.client.chat.completions.create(
-                    model=self.model_name,
-                    messages=[{"role": "user", "content": "test"}],
-                    max_tokens=1
-                )
+                self.client.models.retrieve(self.model_name)
             else:
-                response = openai.ChatCompletion.create(
-                    model=self.model_name,
-                    messages=[{"role": "user", "content": "test"}],
-                    max_tokens=1
-                )
-            return True
+                openai.Model.retrieve(self.model_name)
+            self._available = True
         except Exception:
-            return False
+            self._available = False
+        
+        self._available_checked = now
+        return self._available
 
 class LLMFactory:
     """Factory for creating LLM interfaces"""
@@ -165,15 +475,21 @@ class LLMFactory:
         if model_type == "ollama":
             return OllamaInterface(
                 model_name=model_config.get("model_name", "llama3.2"),
-                base_url=model_config.get("base_url", "http://localhost:11434"),
-                timeout=model_config.get("timeout", 120)
+                base_url=model_config.get("base_urls") or model_config.get("base_url", "http://localhost:11434"),
+                timeout=model_config.get("timeout", 120),
+                keep_alive=model_config.get("keep_alive", "30m"),
+                max_retries=model_config.get("max_retries", 3)
             )
         
         elif model_type == "openai":
             return OpenAIInterface(
                 model_name=model_config.get("model_name", "gpt-3.5-turbo"),
                 max_tokens=model_config.get("max_tokens", 2000),
-                temperature=model_config.get("temperature", 0.1)
+                temperature=model_config.get("temperature", 0.1),
+                use_batch_api=model_config.get("use_batch_api", False),
+                batch_api_min_prompts=model_config.get("batch_api_min_prompts", 50),
+                batch_poll_interval=model_config.get("batch_poll_interval", 30),
+                max_retries=model_config.get("max_retries", 3)
             )
         
         else:
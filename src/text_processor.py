@@ -2,22 +2,61 @@
 Text processing utilities for Document RAG Extractor
 """
 import re
-from typing import List, Dict, Any
+import yaml
+from collections import defaultdict
+from itertools import chain
+from typing import List, Dict, Any, Iterable, Iterator, Optional
 from pathlib import Path
 
+# Prefer the libyaml-backed loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeLoader as _Loader
+
+# Optional multi-keyword matcher for filter_chunks_by_keywords
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Single-character normalizations applied by clean_text
+_TRANSLATE = str.maketrans({
+    '\f': ' ',       # Form feed
+    '\r': ' ',       # Carriage return
+    '\u201c': '"',   # Curly double quotes
+    '\u201d': '"',
+    '\u2018': "'",   # Curly single quotes
+    '\u2019': "'",
+    '\u2013': '-',   # En and em dashes
+    '\u2014': '-',
+})
+# Runs of whitespace other than line breaks, and two or more line breaks
+# (as in BaseProcessor.clean_text, so processor output keeps its line structure)
+_WS_RE = re.compile(r'[^\S\n]+')
+_MULTI_NL = re.compile(r'\s*\n\s*\n\s*')
+_YAML_BLOCK_RE = re.compile(r'```ya?ml\s*\n(.*?)\n```', re.DOTALL | re.IGNORECASE)
+_SECTION_SPLIT_RE = re.compile(r'\n(?=\w+:)')
+
 class TextProcessor:
     """Handles text chunking and processing"""
     
     def __init__(self, chunk_size: int = 2000, overlap: int = 200):
         self.chunk_size = chunk_size
         self.overlap = overlap
+        self._automaton = None
+        self._automaton_keywords: Optional[tuple] = None
     
     def chunk_text(self, text: str) -> List[str]:
-        """Split text into overlapping chunks"""
+        """Split text into overlapping chunks, cleaning each chunk"""
+        return list(self.iter_chunks(text))
+    
+    def iter_chunks(self, text: str) -> Iterator[str]:
+        """Yield overlapping cleaned chunks of text one at a time"""
         if len(text) <= self.chunk_size:
-            return [text]
+            yield self.clean_text(text)
+            return
         
-        chunks = []
         start = 0
         
         while start < len(text):
@@ -25,41 +64,32 @@ class TextProcessor:
             
             # If we're not at the end, try to break at a sentence boundary
             if end < len(text):
-                # Look for sentence endings in the last 200 characters of the chunk
-                chunk_text = text[start:end]
-                last_period = chunk_text.rfind('.')
-                last_newline = chunk_text.rfind('\n')
-                
-                # Use the latest sentence or paragraph boundary
-                break_point = max(last_period, last_newline)
+                # Latest sentence or paragraph boundary inside [start, end), relative to
+                # start; bounded rfind scans in place, without copying the window
+                boundary = max(text.rfind('.', start, end), text.rfind('\n', start, end))
+                break_point = boundary - start if boundary >= 0 else -1
                 if break_point > self.chunk_size - 200:  # Don't break too early
                     end = start + break_point + 1
             
-            chunk = text[start:end].strip()
+            chunk = self.clean_text(text[start:end])
             if chunk:
-                chunks.append(chunk)
+                yield chunk
             
             # Move start position with overlap
             start = end - self.overlap if end < len(text) else len(text)
-        
-        return chunks
     
     def clean_text(self, text: str) -> str:
         """Clean and normalize text"""
         if not text:
             return ""
         
-        # Remove excessive whitespace
-        text = re.sub(r'\s+', ' ', text)
-        
-        # Remove common OCR artifacts
-        text = text.replace('\f', ' ')  # Form feed
-        text = text.replace('\r', ' ')  # Carriage return
+        # Remove common OCR artifacts (form feeds, carriage returns) and
+        # normalize curly quotes and dashes in a single pass
+        text = text.translate(_TRANSLATE)
         
-        # Normalize quotes and dashes
-        text = text.replace('"', '"').replace('"', '"')
-        text = text.replace(''', "'").replace(''', "'")
-        text = text.replace('–', '-').replace('—', '-')
+        # Remove excessive whitespace, keeping paragraph and line breaks
+        text = _WS_RE.sub(' ', text)
+        text = _MULTI_NL.sub('\n\n', text)
         
         return text.strip()
     
@@ -68,12 +98,30 @@ class TextProcessor:
         text_lower = text.lower()
         return any(keyword.lower() in text_lower for keyword in keywords)
     
-    def filter_chunks_by_keywords(self, chunks: List[str], keywords: List[str]) -> List[str]:
-        """Filter chunks that contain relevant keywords"""
+    def _build_automaton(self, keywords: List[str]):
+        """Aho-Corasick automaton over lowercased keywords, rebuilt only when they change"""
+        key = tuple(keywords)
+        if self._automaton_keywords != key:
+            automaton = ahocorasick.Automaton()
+            for keyword in keywords:
+                automaton.add_word(keyword.lower(), keyword)
+            automaton.make_automaton()
+            self._automaton = automaton
+            self._automaton_keywords = key
+        return self._automaton
+    
+    def filter_chunks_by_keywords(self, chunks: Iterable[str], keywords: List[str]) -> Iterator[str]:
+        """Lazily filter chunks that contain relevant keywords"""
         if not keywords:
-            return chunks
+            return iter(chunks)
+        
+        # An empty keyword matches everything, as with the substring check
+        if ahocorasick is None or not all(keywords):
+            return (chunk for chunk in chunks if self.extract_keywords(chunk, keywords))
         
-        return [chunk for chunk in chunks if self.extract_keywords(chunk, keywords)]
+        # One linear scan per chunk regardless of the number of keywords
+        automaton = self._build_automaton(keywords)
+        return (chunk for chunk in chunks if next(automaton.iter(chunk.lower()), None) is not None)
 
 class YAMLProcessor:
     """Handles YAML parsing and merging"""
@@ -81,10 +129,8 @@ class YAMLProcessor:
     @staticmethod
     def parse_yaml_from_text(text: str) -> Dict[str, Any]:
         """Extract YAML content from LLM response"""
-        import yaml
-        
         # Try to find YAML block in response
-        yaml_match = re.search(r'```ya?ml\s*\n(.*?)\n```', text, re.DOTALL | re.IGNORECASE)
+        yaml_match = _YAML_BLOCK_RE.search(text)
         if yaml_match:
             yaml_text = yaml_match.group(1)
         else:
@@ -92,7 +138,7 @@ class YAMLProcessor:
             yaml_text = text.strip()
         
         try:
-            return yaml.safe_load(yaml_text) or {}
+            return yaml.load(yaml_text, Loader=_Loader) or {}
         except yaml.YAMLError as e:
             # If YAML parsing fails, try to extract structured data
             return YAMLProcessor._extract_structured_data(text)
@@ -104,7 +150,7 @@ class YAMLProcessor:
         result = {}
         
         # Look for patterns like "products:", "integrations:", etc.
-        sections = re.split(r'\n(?=\w+:)', text)
+        sections = _SECTION_SPLIT_RE.split(text)
         
         for section in sections:
             if ':' in section:
@@ -126,19 +172,29 @@ class YAMLProcessor:
     @staticmethod
     def merge_yaml_results(results: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Merge multiple YAML results into one"""
-        merged = {}
+        # Group values by key first, then flatten each key's values in one go
+        grouped = defaultdict(list)
         
         for result in results:
             if not isinstance(result, dict):
                 continue
                 
             for key, value in result.items():
-                if key not in merged:
-                    merged[key] = []
-                
-                if isinstance(value, list):
-                    merged[key].extend(value)
-                elif value:  # Skip empty values
-                    merged[key].append(value)
+                grouped[key].append(value)
+        
+        # Lists are extended, other values appended, empty values skipped (as in merge_into)
+        return {
+            key: list(chain.from_iterable(value if isinstance(value, list) else (value,)
+                                          for value in values if value))
+            for key, values in grouped.items()
+        }
+    
+    @staticmethod
+    def merge_into(accumulator: List[Any], value: Any) -> List[Any]:
+        """Merge a single extracted value into an accumulated result list"""
+        if isinstance(value, list):
+            accumulator.extend(value)
+        elif value:  # Skip empty values
+            accumulator.append(value)
         
-        return merged
\ No newline at end of file
+        return accumulator
\ No newline at end of file
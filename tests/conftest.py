@@ -0,0 +1,78 @@
+"""
+Shared fixtures for DocMineAI tests
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "src"))
+
+from llm_interface import LLMInterface
+
+class FakeLLM(LLMInterface):
+    """Deterministic in-process LLM that records the prompts it receives"""
+    
+    model_name = "fake"
+    temperature = 0.1
+    max_tokens = 100
+    
+    def __init__(self, response: str = "products:\n  - Widget\npeople:\n  - Ada\n"):
+        self.response = response
+        self.prompts = []
+        self.closed = False
+    
+    def generate(self, prompt: str) -> str:
+        self.prompts.append(prompt)
+        return self.response
+    
+    def is_available(self) -> bool:
+        return True
+    
+    def close(self):
+        self.closed = True
+
+@pytest.fixture
+def fake_llm():
+    return FakeLLM()
+
+@pytest.fixture
+def project(tmp_path):
+    """Minimal config, prompts and documents directory for running the pipeline"""
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text(
+        "general:\n"
+        "  chunk_size: 300\n"
+        "  overlap: 50\n"
+        "models:\n"
+        "  default: ollama\n"
+        "  ollama:\n"
+        "    model_name: fake\n"
+        "extraction_schema:\n"
+        "  products: {}\n"
+        "  people: {}\n"
+        "processing:\n"
+        "  min_chunk_length: 10\n"
+        "  llm_cache: true\n"
+        f"  llm_cache_dir: {tmp_path / 'llm_cache'}\n"
+        f"  cache_dir: {tmp_path / 'cache'}\n",
+        encoding="utf-8"
+    )
+    
+    prompts_path = tmp_path / "prompts.yaml"
+    prompts_path.write_text(
+        "persona: tester\n"
+        "prompts:\n"
+        "  products: {prompt_template: \"{persona} products: {text_chunk}\"}\n"
+        "  people: {prompt_template: \"{persona} people: {text_chunk}\"}\n",
+        encoding="utf-8"
+    )
+    
+    docs_dir = tmp_path / "docs"
+    docs_dir.mkdir()
+    (docs_dir / "a.txt").write_text("Widgets are sold by Ada. " * 20, encoding="utf-8")
+    (docs_dir / "b.txt").write_text("Another document about gadgets and Bob. " * 5, encoding="utf-8")
+    
+    return {"root": tmp_path, "config": config_path, "prompts": prompts_path, "docs": docs_dir}
@@ -0,0 +1,103 @@
+"""
+Tests for the content-keyed extraction cache in BaseProcessor
+"""
+import os
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from processors.base_processor import BaseProcessor, disk_cached
+
+class CountingProcessor(BaseProcessor):
+    """Text processor that counts how often it really reads a file"""
+    
+    CACHE_CONFIG_KEYS = ('mode',)
+    
+    def __init__(self, config):
+        super().__init__(config)
+        self.calls = []
+    
+    def can_process(self, file_path: Path) -> bool:
+        return True
+    
+    def extract_text(self, file_path: Path) -> str:
+        self.calls.append('text')
+        return file_path.read_text(encoding='utf-8')
+    
+    def extract_metadata(self, file_path: Path):
+        self.calls.append('metadata')
+        return {**self.get_file_info(file_path), "words": len(file_path.read_text(encoding='utf-8').split())}
+    
+    @disk_cached
+    def word_list(self, file_path: Path):
+        self.calls.append('word_list')
+        return file_path.read_text(encoding='utf-8').split()
+
+@pytest.fixture
+def config(tmp_path):
+    return {'use_cache': True, 'cache_dir': str(tmp_path / 'cache'), 'mode': 'a'}
+
+def _write(path: Path, text: str) -> Path:
+    path.write_text(text, encoding='utf-8')
+    return path
+
+def test_cache_is_keyed_on_contents_not_path(tmp_path, config):
+    first = _write(tmp_path / 'first.txt', "same words here")
+    copy = _write(tmp_path / 'copy.txt', "same words here")
+    os.utime(copy, (1_000_000_000, 1_000_000_000))
+    
+    CountingProcessor(config).process(first)
+    processor = CountingProcessor(config)
+    result = processor.process(copy)
+    
+    assert processor.calls == []
+    assert result['text_content'] == "same words here"
+    # Size and timestamps come from the file actually processed
+    assert result['file_name'] == 'copy.txt'
+    assert result['metadata']['modified'] == datetime.fromtimestamp(1_000_000_000).isoformat()
+    assert result['metadata']['words'] == 3
+
+def test_changed_contents_invalidate_the_cache(tmp_path, config):
+    path = _write(tmp_path / 'doc.txt', "old text")
+    CountingProcessor(config).process(path)
+    
+    _write(path, "new text, longer")
+    processor = CountingProcessor(config)
+    
+    assert processor.process(path)['text_content'] == "new text, longer"
+    assert processor.calls == ['text', 'metadata']
+
+def test_only_output_affecting_config_changes_the_key(tmp_path, config):
+    path = _write(tmp_path / 'doc.txt', "some text")
+    CountingProcessor(config).process(path)
+    
+    unrelated = CountingProcessor({**config, 'min_chunk_length': 5})
+    unrelated.process(path)
+    assert unrelated.calls == []
+    
+    changed = CountingProcessor({**config, 'mode': 'b'})
+    changed.process(path)
+    assert changed.calls == ['text', 'metadata']
+
+def test_disk_cached_method(tmp_path, config):
+    path = _write(tmp_path / 'doc.txt', "one two")
+    assert CountingProcessor(config).word_list(path) == ['one', 'two']
+    
+    processor = CountingProcessor(config)
+    assert processor.word_list(path) == ['one', 'two']
+    assert processor.calls == []
+    
+    _write(path, "three")
+    assert processor.word_list(path) == ['three']
+    assert processor.calls == ['word_list']
+
+def test_disk_cached_is_bypassed_without_use_cache(tmp_path, config):
+    path = _write(tmp_path / 'doc.txt', "one two")
+    processor = CountingProcessor({**config, 'use_cache': False})
+    
+    processor.word_list(path)
+    processor.word_list(path)
+    
+    assert processor.calls == ['word_list', 'word_list']
+    assert not (tmp_path / 'cache').exists()
@@ -0,0 +1,66 @@
+"""
+Tests for YAML loading and prompt compilation
+"""
+import os
+
+import pytest
+
+import config_manager
+from config_manager import compile_prompt, load_yaml
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    directory = tmp_path / "yaml_cache"
+    monkeypatch.setattr(config_manager, "CACHE_DIR", directory)
+    return directory
+
+def test_load_yaml_reuses_cache_until_file_changes(tmp_path, cache_dir):
+    path = tmp_path / "settings.yaml"
+    path.write_text("a: 1\nitems: [x, y]\n", encoding="utf-8")
+    
+    assert load_yaml(path) == {"a": 1, "items": ["x", "y"]}
+    assert len(list(cache_dir.iterdir())) == 1
+    assert cache_dir.stat().st_mode & 0o777 == 0o700
+    
+    path.write_text("a: 22\n", encoding="utf-8")
+    assert load_yaml(path) == {"a": 22}
+    assert len(list(cache_dir.iterdir())) == 1
+
+def test_load_yaml_ignores_shared_cache_dir(tmp_path, cache_dir):
+    cache_dir.mkdir(mode=0o777)
+    os.chmod(cache_dir, 0o777)
+    path = tmp_path / "settings.yaml"
+    path.write_text("a: 1\n", encoding="utf-8")
+    
+    assert load_yaml(path) == {"a": 1}
+    assert list(cache_dir.iterdir()) == []
+
+def test_load_yaml_skips_values_marshal_cannot_store(tmp_path, cache_dir):
+    path = tmp_path / "dated.yaml"
+    path.write_text("released: 2024-01-02\n", encoding="utf-8")
+    
+    assert str(load_yaml(path)["released"]) == "2024-01-02"
+    assert str(load_yaml(path)["released"]) == "2024-01-02"
+
+@pytest.mark.parametrize("template", [
+    "{persona}: extract from {text_chunk}",
+    "no fields at all",
+    "{text_chunk}",
+    "{text_chunk} then {text_chunk} again, by {persona}",
+    "{{literal braces}} {persona} {{text_chunk}} {text_chunk}",
+    "{persona!r} uses a conversion: {text_chunk}",
+    "{persona:>20} uses a spec: {text_chunk}",
+])
+@pytest.mark.parametrize("chunk", ["plain", "braces {persona} {0} }{", ""])
+def test_compile_prompt_matches_str_format(template, chunk):
+    persona = "an analyst {with braces}"
+    
+    assert compile_prompt(template, persona)(chunk) == template.format(persona=persona, text_chunk=chunk)
+
+@pytest.mark.parametrize("template", ["{unknown} {text_chunk}", "{0}", "unbalanced {", "stray }"])
+def test_compile_prompt_raises_like_str_format(template):
+    with pytest.raises(Exception) as expected:
+        template.format(persona="p", text_chunk="t")
+    
+    with pytest.raises(type(expected.value)):
+        compile_prompt(template, "p")("t")
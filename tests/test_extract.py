@@ -0,0 +1,52 @@
+"""
+End-to-end tests for the DocumentRAGExtractor pipeline and CLI
+"""
+import sys
+
+import yaml
+
+import extract
+
+def _run_cli(monkeypatch, project, fake_llm, *args):
+    monkeypatch.setattr(extract.LLMFactory, "create_llm", staticmethod(lambda config, model_type: fake_llm))
+    monkeypatch.setattr(sys, "argv", [
+        "extract.py",
+        "--docs-dir", str(project["docs"]),
+        "--config", str(project["config"]),
+        "--prompts", str(project["prompts"]),
+        *args
+    ])
+    extract.main()
+
+def test_stream_with_llm_cache_writes_every_document(monkeypatch, project, fake_llm):
+    output = project["root"] / "out.yaml"
+    _run_cli(monkeypatch, project, fake_llm, "--stream", "--output", str(output))
+    
+    documents = list(yaml.safe_load_all(output.read_text(encoding="utf-8")))
+    assert documents[0]["extraction_metadata"]["total_documents"] == 2
+    
+    results = {name: values for document in documents[1:] for name, values in document.items()}
+    assert set(results) == {"a.txt", "b.txt"}
+    assert results["a.txt"]["products"] and results["a.txt"]["people"]
+    assert fake_llm.prompts and fake_llm.closed
+
+def test_batch_output_with_llm_cache(monkeypatch, project, fake_llm):
+    output = project["root"] / "out.yaml"
+    _run_cli(monkeypatch, project, fake_llm, "--output", str(output))
+    
+    results = yaml.safe_load(output.read_text(encoding="utf-8"))
+    assert results["extraction_metadata"]["total_documents"] == 2
+    assert "Widget" in results["products"]
+    assert fake_llm.closed
+
+def test_close_releases_processors(monkeypatch, project, fake_llm):
+    monkeypatch.setattr(extract.LLMFactory, "create_llm", staticmethod(lambda config, model_type: fake_llm))
+    extractor = extract.DocumentRAGExtractor(str(project["config"]), str(project["prompts"]))
+    
+    closed = []
+    extractor.processors["image"] = type("Processor", (), {"close": lambda self: closed.append(True)})()
+    extractor.processors["pdf"] = None
+    extractor.close()
+    
+    assert closed == [True]
+    assert fake_llm.closed
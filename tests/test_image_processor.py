@@ -0,0 +1,79 @@
+"""
+Tests for batched OCR in the image processor (the EasyOCR reader is faked)
+"""
+import logging
+from collections import OrderedDict
+from types import SimpleNamespace
+
+from processors import image_processor
+from processors.image_processor import ImageProcessor
+
+class FakeImage:
+    size = (200, 100)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        return False
+
+class FakeReader:
+    """Records every readtext_batched call and runs out of memory above max_images"""
+    
+    def __init__(self, max_images):
+        self.max_images = max_images
+        self.calls = []
+    
+    def readtext_batched(self, images, n_width, n_height, batch_size):
+        self.calls.append(len(images))
+        if len(images) > self.max_images:
+            raise RuntimeError("CUDA out of memory")
+        return [[([[0, 0], [1, 0], [1, 1], [0, 1]], image, 0.9)] for image in images]
+
+def _processor(monkeypatch, reader, batch_size):
+    monkeypatch.setattr(image_processor, "Image", SimpleNamespace(open=lambda path: FakeImage()))
+    processor = ImageProcessor.__new__(ImageProcessor)
+    processor.config = {}
+    processor.logger = logging.getLogger("test")
+    processor.reader = reader
+    processor.ocr_batch_size = batch_size
+    processor.ocr_batch_height = 100
+    processor.ocr_cache_size = 64
+    processor._ocr_cache = OrderedDict()
+    processor._turbojpeg = None
+    processor.ocr_precision = 'fp32'
+    processor.confidence_threshold = 0.5
+    processor._detector_max_batch = None
+    return processor
+
+def test_detector_batches_never_exceed_ocr_batch_size(monkeypatch, tmp_path):
+    reader = FakeReader(max_images=100)
+    processor = _processor(monkeypatch, reader, batch_size=4)
+    paths = [tmp_path / f"{i}.png" for i in range(10)]
+    
+    texts = processor.extract_text_batch(paths)
+    
+    assert reader.calls == [4, 4, 2]
+    assert all(texts[path] == str(path) for path in paths)
+
+def test_out_of_memory_shrinks_only_the_current_call(monkeypatch, tmp_path):
+    reader = FakeReader(max_images=2)
+    processor = _processor(monkeypatch, reader, batch_size=4)
+    paths = [tmp_path / f"{i}.png" for i in range(5)]
+    
+    texts = processor.extract_text_batch(paths)
+    
+    assert reader.calls == [4, 2, 2, 1]
+    assert processor.ocr_batch_size == 4
+    assert all(texts[path] == str(path) for path in paths)
+
+def test_detector_batches_fit_the_tensorrt_engine(monkeypatch, tmp_path):
+    reader = FakeReader(max_images=100)
+    processor = _processor(monkeypatch, reader, batch_size=8)
+    processor._detector_max_batch = 3
+    paths = [tmp_path / f"{i}.png" for i in range(64)]
+    
+    processor.extract_text_batch(paths)
+    
+    assert max(reader.calls) == 3
+    assert sum(reader.calls) == 64
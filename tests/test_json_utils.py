@@ -0,0 +1,46 @@
+"""
+Tests for JSON output helpers
+"""
+from datetime import datetime
+
+import pytest
+
+from utils import json_utils
+from utils.json_utils import load_json, save_json, save_json_streaming
+
+def _data():
+    return {
+        "metadata": {"created": datetime(2024, 1, 2, 3, 4, 5), "count": 3, 1: "int key"},
+        "documents": [
+            {"file_name": "a.pdf", "text": "café “quoted”\nnext line", "score": 0.5},
+            {"file_name": "b.docx", "items": [1, 2, {"nested": None}], "ok": True},
+            {"file_name": "c.png", "items": []},
+        ],
+        "summary": "done",
+    }
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def encoder(request, monkeypatch):
+    if request.param == "stdlib":
+        monkeypatch.setattr(json_utils, "orjson", None)
+    elif json_utils.orjson is None:
+        pytest.skip("orjson not installed")
+    return request.param
+
+def test_streaming_round_trip_matches_save_json(tmp_path, encoder):
+    plain = tmp_path / "plain.json"
+    streamed = tmp_path / "streamed.json"
+    
+    assert save_json(_data(), plain)
+    data = _data()
+    data["documents"] = (document for document in data["documents"])
+    assert save_json_streaming(data, streamed)
+    
+    assert load_json(streamed) == load_json(plain)
+    assert list(load_json(streamed)) == ["metadata", "documents", "summary"]
+
+def test_streaming_empty_documents(tmp_path, encoder):
+    path = tmp_path / "empty.json"
+    
+    assert save_json_streaming({"documents": iter(()), "total": 0}, path)
+    assert load_json(path) == {"documents": [], "total": 0}
@@ -0,0 +1,49 @@
+"""
+Tests for the LLM response cache
+"""
+import asyncio
+
+import pytest
+
+from conftest import FakeLLM
+from llm_cache import CachedLLM
+
+def test_repeated_prompts_are_served_from_cache(tmp_path):
+    llm = FakeLLM()
+    cached = CachedLLM(llm, cache_dir=str(tmp_path))
+    
+    assert asyncio.run(cached.agenerate_batch(["a", "b", "a"])) == [llm.response] * 3
+    assert cached.generate("b") == llm.response
+    assert llm.prompts == ["a", "b"]
+    cached.close()
+    
+    # A new instance reads the responses back from disk
+    llm = FakeLLM()
+    cached = CachedLLM(llm, cache_dir=str(tmp_path))
+    assert cached.generate("a") == llm.response
+    assert llm.prompts == []
+    cached.close()
+
+def test_cache_key_includes_model_settings(tmp_path):
+    first = CachedLLM(FakeLLM(), cache_dir=str(tmp_path))
+    first.generate("a")
+    first.close()
+    
+    llm = FakeLLM()
+    llm.max_tokens = 200
+    second = CachedLLM(llm, cache_dir=str(tmp_path))
+    second.generate("a")
+    assert llm.prompts == ["a"]
+    second.close()
+
+def test_close_is_terminal(tmp_path):
+    llm = FakeLLM()
+    cached = CachedLLM(llm, cache_dir=str(tmp_path))
+    cached.close()
+    cached.close()
+    
+    assert llm.closed
+    with pytest.raises(RuntimeError, match="closed"):
+        cached.generate("a")
+    with pytest.raises(RuntimeError, match="closed"):
+        asyncio.run(cached.agenerate_batch(["a"]))
@@ -0,0 +1,42 @@
+"""
+Tests for the shared LLMInterface batching logic
+"""
+import asyncio
+import threading
+
+from llm_interface import LLMInterface
+
+class EchoLLM(LLMInterface):
+    """Answers each prompt with its upper-cased text and fails on 'bad'"""
+    
+    def __init__(self):
+        self.prompts = []
+        self._lock = threading.Lock()
+    
+    def generate(self, prompt: str) -> str:
+        with self._lock:
+            self.prompts.append(prompt)
+        if prompt == "bad":
+            raise ValueError("bad prompt")
+        return prompt.upper()
+    
+    def is_available(self) -> bool:
+        return True
+
+def test_agenerate_batch_sends_each_prompt_once_in_order():
+    llm = EchoLLM()
+    prompts = ["b", "a", "b", "c", "a", "b"]
+    
+    responses = asyncio.run(llm.agenerate_batch(prompts, max_concurrency=2))
+    
+    assert responses == ["B", "A", "B", "C", "A", "B"]
+    assert sorted(llm.prompts) == ["a", "b", "c"]
+
+def test_agenerate_batch_maps_failures_to_every_duplicate():
+    llm = EchoLLM()
+    
+    responses = asyncio.run(llm.agenerate_batch(["bad", "ok", "bad"]))
+    
+    assert isinstance(responses[0], ValueError) and responses[2] is responses[0]
+    assert responses[1] == "OK"
+    assert llm.prompts.count("bad") == 1
@@ -0,0 +1,60 @@
+"""
+Tests for text cleaning and chunking
+"""
+import random
+
+import pytest
+
+from text_processor import TextProcessor
+
+def test_clean_text_keeps_line_breaks():
+    processor = TextProcessor()
+    
+    text = "Title\r\n\n\n  First   line\t“quoted”\nSecond line \f\n\n\n\nEnd  "
+    
+    assert processor.clean_text(text) == 'Title\n\nFirst line "quoted"\nSecond line\n\nEnd'
+
+def test_clean_text_leaves_processor_output_unchanged():
+    processor = TextProcessor()
+    cleaned = "Heading\n\nParagraph one.\nLine two.\n\nParagraph two."
+    
+    assert processor.clean_text(cleaned) == cleaned
+
+def _reference_chunks(processor, text):
+    """The original copy-and-rfind chunking loop that iter_chunks must reproduce"""
+    if len(text) <= processor.chunk_size:
+        return [processor.clean_text(text)]
+    
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = start + processor.chunk_size
+        if end < len(text):
+            window = text[start:end]
+            break_point = max(window.rfind('.'), window.rfind('\n'))
+            if break_point > processor.chunk_size - 200:
+                end = start + break_point + 1
+        
+        chunk = processor.clean_text(text[start:end])
+        if chunk:
+            chunks.append(chunk)
+        start = end - processor.overlap if end < len(text) else len(text)
+    return chunks
+
+def _random_text(rng, length):
+    alphabet = "abcdefghij" * 4 + "    " + ".." + "\n"
+    return "".join(rng.choice(alphabet) for _ in range(length))
+
+@pytest.mark.parametrize("chunk_size, overlap", [(250, 30), (300, 50), (500, 100), (1000, 200)])
+def test_iter_chunks_matches_reference(chunk_size, overlap):
+    rng = random.Random(chunk_size)
+    processor = TextProcessor(chunk_size=chunk_size, overlap=overlap)
+    
+    texts = [_random_text(rng, length) for length in (0, chunk_size, chunk_size + 1, 3 * chunk_size, 20 * chunk_size)]
+    # No boundaries at all, and boundaries only early in each window
+    texts.append("x" * (5 * chunk_size))
+    texts.append(("." + "y" * (chunk_size - 1)) * 4)
+    
+    for text in texts:
+        assert processor.chunk_text(text) == _reference_chunks(processor, text)
+        assert list(processor.iter_chunks(text)) == processor.chunk_text(text)
@@ -1,13 +1,15 @@
 """
 File utilities for document processing
 """
+import os
+import time
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import logging
 
 logger = logging.getLogger(__name__)
 
-def get_supported_files(directory: Path, extensions: Dict[str, List[str]]) -> Dict[str, List[Path]]:
+def get_supported_files(directory: Path, extensions: Dict[str, List[str]], recursive: bool = False) -> Dict[str, List[Path]]:
     """Get all supported files organized by type"""
     if not directory.exists():
         logger.error(f"Directory does not exist: {directory}")
@@ -15,15 +17,24 @@ def get_supported_files(directory: Path, extensions: Dict[str, List[str]]) -> Di
     
     files_by_type = {file_type: [] for file_type in extensions.keys()}
     
-    for file_path in directory.iterdir():
-        if file_path.is_file():
-            file_ext = file_path.suffix.lower()
-            
-            # Check which type this file belongs to
-            for file_type, type_extensions in extensions.items():
-                if file_ext in type_extensions:
-                    files_by_type[file_type].append(file_path)
-                    break
+    # Map each extension to its file type so every entry needs one lookup; entry
+    # suffixes are lowercased, so configured extensions must be too
+    ext_to_type = {}
+    for file_type, type_extensions in extensions.items():
+        for ext in type_extensions:
+            ext_to_type.setdefault(ext.lower(), file_type)
+    
+    def scan(path):
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if recursive and entry.is_dir(follow_symlinks=False):
+                    scan(entry.path)
+                elif entry.is_file():
+                    file_type = ext_to_type.get(os.path.splitext(entry.name)[1].lower())
+                    if file_type:
+                        files_by_type[file_type].append(Path(entry.path))
+    
+    scan(directory)
     
     # Log summary
     total_files = sum(len(files) for files in files_by_type.values())
@@ -34,10 +45,11 @@ def get_supported_files(directory: Path, extensions: Dict[str, List[str]]) -> Di
     
     return files_by_type
 
-def validate_file_size(file_path: Path, max_size_mb: int) -> bool:
-    """Check if file size is within limits"""
+def validate_file_size(file_path: Path, max_size_mb: int, stat: Optional[os.stat_result] = None) -> bool:
+    """Check if file size is within limits, reusing a pre-fetched stat if given"""
     try:
-        size_mb = file_path.stat().st_size / (1024 * 1024)
+        stat = stat or file_path.stat()
+        size_mb = stat.st_size / (1024 * 1024)
         if size_mb > max_size_mb:
             logger.warning(f"File {file_path.name} is {size_mb:.1f}MB, exceeds limit of {max_size_mb}MB")
             return False
@@ -46,6 +58,21 @@ def validate_file_size(file_path: Path, max_size_mb: int) -> bool:
         logger.error(f"Error checking file size for {file_path}: {e}")
         return False
 
+def prefetch_files(file_paths: List[Path]):
+    """Ask the kernel to start reading files into the page cache ahead of use"""
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    
+    for file_path in file_paths:
+        try:
+            fd = os.open(file_path, os.O_RDONLY)
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+            finally:
+                os.close(fd)
+        except OSError as e:
+            logger.debug(f"Could not prefetch {file_path}: {e}")
+
 def ensure_output_directory(output_dir: Path) -> bool:
     """Ensure output directory exists"""
     try:
@@ -61,10 +88,12 @@ def backup_existing_file(file_path: Path) -> bool:
         return True
     
     try:
-        backup_path = file_path.with_suffix(f'{file_path.suffix}.backup')
+        # A nanosecond timestamp is unique in practice, so prior backups need not be probed
+        stamp = time.time_ns()
+        backup_path = file_path.with_suffix(f'{file_path.suffix}.backup.{stamp}')
         counter = 1
         while backup_path.exists():
-            backup_path = file_path.with_suffix(f'{file_path.suffix}.backup.{counter}')
+            backup_path = file_path.with_suffix(f'{file_path.suffix}.backup.{stamp}.{counter}')
             counter += 1
         
         file_path.rename(backup_path)
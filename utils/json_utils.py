@@ -7,13 +7,64 @@ from typing import Dict, Any, List
 from datetime import datetime
 import logging
 
+# orjson is optional; it is much faster than the stdlib encoder on large outputs
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 def save_json(data: Dict[str, Any], output_path: Path, indent: int = 2) -> bool:
     """Save data as JSON file with proper formatting"""
     try:
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=indent, ensure_ascii=False, default=str)
+        if orjson is not None and indent in (None, 2):
+            # Datetimes go through default=str, as with the stdlib encoder
+            option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_PASSTHROUGH_DATETIME
+            if indent:
+                option |= orjson.OPT_INDENT_2
+            with open(output_path, 'wb') as f:
+                f.write(orjson.dumps(data, option=option, default=str))
+        else:
+            with open(output_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=indent, ensure_ascii=False, default=str)
+        logger.info(f"Saved JSON data to {output_path}")
+        return True
+    except Exception as e:
+        logger.error(f"Failed to save JSON to {output_path}: {e}")
+        return False
+
+def _dumps(value: Any) -> bytes:
+    """Compact JSON encoding of a single value, matching save_json's handling of odd types"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_PASSTHROUGH_DATETIME
+        return orjson.dumps(value, option=option, default=str)
+    return json.dumps(value, ensure_ascii=False, default=str).encode('utf-8')
+
+def save_json_streaming(data: Dict[str, Any], output_path: Path, stream_key: str = "documents") -> bool:
+    """Save data as compact JSON, encoding the items under stream_key one at a time
+    
+    data[stream_key] may be any iterable (e.g. a generator of documents), so only
+    one item's encoding is held in memory. Items are written one per line.
+    """
+    try:
+        with open(output_path, 'wb') as f:
+            f.write(b'{')
+            for position, (key, value) in enumerate(data.items()):
+                if position:
+                    f.write(b',')
+                f.write(_dumps(str(key)) + b':')
+                
+                if key != stream_key:
+                    f.write(_dumps(value))
+                    continue
+                
+                f.write(b'[')
+                for i, item in enumerate(value):
+                    f.write(b',\n' if i else b'\n')
+                    f.write(_dumps(item))
+                f.write(b'\n]')
+            f.write(b'}\n')
         logger.info(f"Saved JSON data to {output_path}")
         return True
     except Exception as e:
@@ -23,8 +74,12 @@ def save_json(data: Dict[str, Any], output_path: Path, indent: int = 2) -> bool:
 def load_json(file_path: Path) -> Dict[str, Any]:
     """Load JSON data from file"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        if orjson is not None:
+            with open(file_path, 'rb') as f:
+                data = orjson.loads(f.read())
+        else:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
         logger.info(f"Loaded JSON data from {file_path}")
         return data
     except Exception as e:
@@ -33,46 +88,46 @@ def load_json(file_path: Path) -> Dict[str, Any]:
 
 def create_extraction_summary(processed_results: List[Dict[str, Any]]) -> Dict[str, Any]:
     """Create a summary of extraction results"""
-    successful = [r for r in processed_results if r.get('success', False)]
-    failed = [r for r in processed_results if not r.get('success', False)]
+    successful = 0
+    total_chars = 0
+    failed_files = []
     
-    # Count by file type
+    # Count by file type and collect text statistics in a single pass
     file_types = {}
     for result in processed_results:
         file_type = result.get('file_type', 'unknown')
-        if file_type not in file_types:
-            file_types[file_type] = {'total': 0, 'successful': 0, 'failed': 0}
+        counts = file_types.get(file_type)
+        if counts is None:
+            counts = file_types[file_type] = {'total': 0, 'successful': 0, 'failed': 0}
         
-        file_types[file_type]['total'] += 1
+        counts['total'] += 1
         if result.get('success', False):
-            file_types[file_type]['successful'] += 1
+            counts['successful'] += 1
+            successful += 1
+            total_chars += len(result.get('text_content', ''))
         else:
-            file_types[file_type]['failed'] += 1
+            counts['failed'] += 1
+            failed_files.append({
+                "file": result.get('file_name'),
+                "error": result.get('error'),
+                "processor": result.get('processor')
+            })
     
-    # Calculate text statistics
-    total_chars = sum(len(r.get('text_content', '')) for r in successful)
-    avg_chars = total_chars / len(successful) if successful else 0
+    avg_chars = total_chars / successful if successful else 0
     
     return {
         "processing_summary": {
             "total_files": len(processed_results),
-            "successful": len(successful),
-            "failed": len(failed),
-            "success_rate": f"{(len(successful) / len(processed_results) * 100):.1f}%" if processed_results else "0%"
+            "successful": successful,
+            "failed": len(failed_files),
+            "success_rate": f"{(successful / len(processed_results) * 100):.1f}%" if processed_results else "0%"
         },
         "by_file_type": file_types,
         "text_statistics": {
             "total_characters": total_chars,
             "average_characters_per_file": round(avg_chars, 1)
         },
-        "failed_files": [
-            {
-                "file": r.get('file_name'),
-                "error": r.get('error'),
-                "processor": r.get('processor')
-            }
-            for r in failed
-        ] if failed else []
+        "failed_files": failed_files
     }
 
 def structure_extracted_data(processed_results: List[Dict[str, Any]]) -> Dict[str, Any]:
@@ -95,6 +150,9 @@ def structure_extracted_data(processed_results: List[Dict[str, Any]]) -> Dict[st
     
     # Process each document
     for result in successful_extractions:
+        text = result.get('text_content', '') or ''
+        text_length = len(text)
+        
         document_data = {
             "file_info": {
                 "name": result.get('file_name'),
@@ -104,9 +162,9 @@ def structure_extracted_data(processed_results: List[Dict[str, Any]]) -> Dict[st
                 "processed_at": result.get('processed_at')
             },
             "content": {
-                "raw_text": result.get('text_content', ''),
-                "text_length": len(result.get('text_content', '')),
-                "preview": result.get('text_content', '')[:200] + "..." if len(result.get('text_content', '')) > 200 else result.get('text_content', '')
+                "raw_text": text,
+                "text_length": text_length,
+                "preview": text[:200] + "..." if text_length > 200 else text
             },
             "metadata": result.get('metadata', {}),
             # Placeholder for future LLM processing